@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from accounts.models import User
+
+
+class Command(BaseCommand):
+    help = "Recount users' learning statistics to repair drift in the running totals"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--email", help="Only reconcile the user with this email")
+
+    def handle(self, *args, **options):
+        users = User.objects.all()
+        if options["email"]:
+            users = users.filter(email=options["email"])
+
+        count = 0
+        for user in users.iterator():
+            user.update_learning_stats()
+            count += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Reconciled {count} users"))
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.2 on 2026-10-17 10:00
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_quiz_score_total(apps, schema_editor):
+    User = apps.get_model("accounts", "User")
+    QuizSession = apps.get_model("quizzes", "QuizSession")
+    totals = (
+        QuizSession.objects.filter(user=OuterRef("pk"))
+        .order_by()
+        .values("user")
+        .annotate(total=Sum("score"))
+        .values("total")
+    )
+    User.objects.update(quiz_score_total=Coalesce(Subquery(totals), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('quizzes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='quiz_score_total',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_quiz_score_total, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,9 @@
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast, Coalesce, NullIf
 
 
 class User(AbstractUser):
@@ -29,10 +33,17 @@ class User(AbstractUser):
     total_quizzes = models.IntegerField(default=0)
     words_learned = models.IntegerField(default=0)
     average_score = models.FloatField(default=0.0)
+    quiz_score_total = models.BigIntegerField(default=0)  # running sum of scores
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["username", "first_name", "last_name"]
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Newest-first admin user list
+            models.Index(fields=["-date_joined"], name="user_date_joined_idx"),
+        ]
+
     def __str__(self):
         return f"{self.get_full_name()} ({self.email})"
 
@@ -40,13 +51,40 @@ class User(AbstractUser):
     def name(self):
         return self.get_full_name() or self.username
 
+    def apply_learning_stats_delta(self, quizzes=0, score=0, words_learned=0):
+        """Incrementally update learning statistics in one atomic UPDATE"""
+        changes = {"words_learned": F("words_learned") + words_learned}
+        if quizzes or score:
+            total_quizzes = F("total_quizzes") + quizzes
+            quiz_score_total = F("quiz_score_total") + score
+            changes.update(
+                total_quizzes=total_quizzes,
+                quiz_score_total=quiz_score_total,
+                average_score=Coalesce(
+                    Cast(quiz_score_total, FloatField()) / NullIf(total_quizzes, 0),
+                    0.0,
+                ),
+            )
+        User.objects.filter(pk=self.pk).update(**changes)
+
     def update_learning_stats(self):
-        """Update user's learning statistics"""
-        from quizzes.models import QuizSession
+        """Recount user's learning statistics from scratch.
+
+        Normal writes go through apply_learning_stats_delta; this full recount
+        is used to reconcile drift (see the reconcile_learning_stats command).
+        """
+        from quizzes.models import QuizSession, ArchivedQuizSession
         from progress.models import UserProgress
 
-        # Update total quizzes
-        self.total_quizzes = QuizSession.objects.filter(user=self).count()
+        # Update total quizzes and score total, archived sessions included
+        self.total_quizzes = 0
+        self.quiz_score_total = 0
+        for model in (QuizSession, ArchivedQuizSession):
+            totals = model.objects.filter(user=self).aggregate(
+                count=models.Count("id"), total=models.Sum("score")
+            )
+            self.total_quizzes += totals["count"]
+            self.quiz_score_total += totals["total"] or 0
 
         # Update words learned (mastered vocabulary)
         self.words_learned = UserProgress.objects.filter(
@@ -54,11 +92,44 @@ class User(AbstractUser):
         ).count()
 
         # Update average score
-        quiz_sessions = QuizSession.objects.filter(user=self)
-        if quiz_sessions.exists():
-            self.average_score = (
-                quiz_sessions.aggregate(avg_score=models.Avg("score"))["avg_score"]
-                or 0.0
-            )
+        self.average_score = (
+            self.quiz_score_total / self.total_quizzes if self.total_quizzes else 0.0
+        )
+
+        self.save(
+            update_fields=[
+                "total_quizzes",
+                "words_learned",
+                "average_score",
+                "quiz_score_total",
+            ]
+        )
 
-        self.save(update_fields=["total_quizzes", "words_learned", "average_score"])
+
+class IdempotencyKey(models.Model):
+    """A client-supplied Idempotency-Key and the response it was answered with.
+
+    Claimed before the request runs; `response_status` stays None until the
+    response is stored. Expired keys can be claimed again and are deleted by
+    the purge_idempotency_keys command.
+    """
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    endpoint = models.CharField(max_length=255)
+    key = models.CharField(max_length=255)
+    # SHA-256 of the request body, to reject a key reused for another request
+    fingerprint = models.CharField(max_length=64)
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "endpoint", "key"], name="idempotency_unique_key"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.endpoint} {self.key}"
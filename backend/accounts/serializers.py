@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
+from config.sparse_fields import SparseFieldsetSerializerMixin
 from .models import User
 
 
@@ -98,9 +99,13 @@ class UserProfileSerializer(serializers.ModelSerializer):
         return instance
 
 
-class UserManagementSerializer(serializers.ModelSerializer):
+class UserManagementSerializer(
+    SparseFieldsetSerializerMixin, serializers.ModelSerializer
+):
     name = serializers.CharField(source="get_full_name", read_only=True)
 
+    sparse_field_columns = {"name": ["first_name", "last_name"]}
+
     class Meta:
         model = User
         fields = (
@@ -4,6 +4,8 @@ from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import update_session_auth_hash
 from django.db.models import Q
+from config.pagination import KeysetPagination
+from config.sparse_fields import SparseFieldsetViewMixin
 from .models import User
 from .serializers import (
     UserRegistrationSerializer,
@@ -79,10 +81,11 @@ class ChangePasswordView(generics.GenericAPIView):
 
 
 # User Management Views (Admin only)
-class UserListView(generics.ListAPIView):
+class UserListView(SparseFieldsetViewMixin, generics.ListAPIView):
     serializer_class = UserManagementSerializer
     permission_classes = [permissions.IsAuthenticated]
-    pagination_class = None  # Disable pagination for user list
+    pagination_class = KeysetPagination  # only with ?pagination=cursor
+    keyset_ordering = "-date_joined"
     filterset_fields = ["role", "status"]
     search_fields = ["email", "first_name", "last_name", "username"]
     ordering_fields = ["date_joined", "last_login", "email"]
@@ -0,0 +1,107 @@
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+from accounts.models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+
+# How long a claimed key may stay in progress before another request can
+# take it over, e.g. after a worker died mid-request
+IN_PROGRESS_TTL = 60
+
+
+def claim_key(lookup, fingerprint):
+    """Claim an idempotency key; returns the claimed row, or None if taken.
+
+    A new key is claimed by inserting its row, which the unique constraint
+    makes atomic. An expired row, finished or abandoned, is taken over with
+    a conditional UPDATE, so only one of several racing requests wins it.
+    """
+    now = timezone.now()
+    claim = dict(
+        fingerprint=fingerprint,
+        response_status=None,
+        response_body=None,
+        expires_at=now + timedelta(seconds=IN_PROGRESS_TTL),
+    )
+    try:
+        with transaction.atomic():
+            return IdempotencyKey.objects.create(**lookup, **claim)
+    except IntegrityError:
+        pass
+    if IdempotencyKey.objects.filter(**lookup, expires_at__lte=now).update(**claim):
+        return IdempotencyKey.objects.filter(**lookup).first()
+    return None
+
+
+def idempotent(view):
+    """Replay the stored response when a write is retried with the same key.
+
+    Requests without an Idempotency-Key header run as usual. The first request
+    with a key claims it (see claim_key); concurrent duplicates get 409 while
+    it runs. Its response is then stored for IDEMPOTENCY_KEY_TTL seconds and
+    replayed to retries without running the view again. Server errors are not
+    stored, so the client can retry them. Reusing a key with a different
+    request body is rejected with 422.
+    """
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return view(request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return Response(
+                {"error": f"{IDEMPOTENCY_HEADER} is too long"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Keys are scoped per user and endpoint
+        lookup = {"user": request.user, "endpoint": request.path, "key": key}
+        fingerprint = hashlib.sha256(
+            json.dumps(request.data, sort_keys=True, default=str).encode()
+        ).hexdigest()
+
+        record = claim_key(lookup, fingerprint)
+        if record is None:
+            entry = IdempotencyKey.objects.filter(**lookup).first()
+            if entry is None or entry.response_status is None:
+                return Response(
+                    {"error": "A request with this key is already in progress"},
+                    status=status.HTTP_409_CONFLICT,
+                )
+            if entry.fingerprint != fingerprint:
+                return Response(
+                    {"error": "This key was already used for a different request"},
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                )
+            response = Response(entry.response_body, status=entry.response_status)
+            response["Idempotent-Replayed"] = "true"
+            return response
+
+        claimed = IdempotencyKey.objects.filter(pk=record.pk, fingerprint=fingerprint)
+        try:
+            response = view(request, *args, **kwargs)
+        except Exception:
+            claimed.delete()
+            raise
+
+        if response.status_code >= 500:
+            claimed.delete()
+        else:
+            claimed.update(
+                response_status=response.status_code,
+                response_body=response.data,
+                expires_at=timezone.now()
+                + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL),
+            )
+        return response
+
+    return wrapper
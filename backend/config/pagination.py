@@ -0,0 +1,153 @@
+import base64
+import binascii
+import json
+from datetime import date
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def _encode_value(value):
+    # Full precision; DjangoJSONEncoder would drop microseconds
+    return value.isoformat() if isinstance(value, date) else value
+
+
+class KeysetPagination(BasePagination):
+    """Keyset pagination with opaque cursors over a view's natural ordering.
+
+    Views opt in by setting this as their pagination class and naming the
+    ordering in `keyset_ordering`; the primary key is appended as a
+    tie-breaker, so rows sharing a value are never skipped or repeated. A
+    cursor holds the (ordering values, pk) of the row it continues from.
+    Unless `opt_in` is turned off, clients only get pages when they ask for
+    them with `?pagination=cursor`, so existing clients keep receiving the
+    full list.
+    """
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+    opt_in = True
+    opt_in_query_param = "pagination"
+
+    def is_requested(self, request):
+        if not self.opt_in:
+            return True
+        return request.query_params.get(self.opt_in_query_param) == "cursor"
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def get_ordering(self, view):
+        ordering = getattr(view, "keyset_ordering", None) or "-pk"
+        ordering = (ordering,) if isinstance(ordering, str) else tuple(ordering)
+        if ordering[-1].lstrip("-") in ("pk", "id"):
+            return ordering
+        return ordering + ("-pk" if ordering[-1].startswith("-") else "pk",)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            values, reverse = cursor["values"], bool(cursor["reverse"])
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if (
+            not isinstance(values, list)
+            or len(values) != len(self.ordering)
+            or not all(isinstance(value, (str, int, float)) for value in values)
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return values, reverse
+
+    def encode_cursor(self, row, reverse):
+        values = [
+            _encode_value(getattr(row, field.lstrip("-"))) for field in self.ordering
+        ]
+        cursor = json.dumps({"values": values, "reverse": reverse})
+        encoded = base64.urlsafe_b64encode(cursor.encode()).decode()
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param, encoded
+        )
+
+    @staticmethod
+    def after(ordering, values):
+        """Rows strictly after `values` in `ordering`, as one row comparison.
+
+        (a, b) > (x, y) becomes a > x OR (a = x AND b > y), flipping the
+        comparison for descending fields.
+        """
+        condition = Q()
+        equal = Q()
+        for field, value in zip(ordering, values):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            condition |= equal & Q(**{f"{name}__{lookup}": value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_requested(request):
+            return None
+
+        self.request = request
+        self.ordering = self.get_ordering(view)
+        page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+        reverse = cursor is not None and cursor[1]
+
+        # Previous pages are read backwards from the cursor, then flipped
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(
+                field[1:] if field.startswith("-") else f"-{field}"
+                for field in ordering
+            )
+        queryset = queryset.order_by(*ordering)
+        if cursor is not None:
+            try:
+                queryset = queryset.filter(self.after(ordering, cursor[0]))
+            except (ValidationError, ValueError, TypeError):
+                # Well-formed, but the values don't fit the ordering fields
+                raise NotFound(self.invalid_cursor_message)
+
+        rows = list(queryset[: page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        self.page = rows
+        return rows
+
+    def get_next_link(self):
+        if not (self.has_next and self.page):
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not (self.has_previous and self.page):
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
@@ -155,6 +155,20 @@ REST_FRAMEWORK = {
     "PAGE_SIZE": 20,
 }
 
+# Quiz pools: ready-made quizzes kept per (topic, question count)
+QUIZ_POOL_SIZE = config("QUIZ_POOL_SIZE", default=5, cast=int)
+QUIZ_POOL_QUESTION_COUNTS = [5, 10, 15, 20]
+
+# How long a generated quiz is held server-side awaiting submission (seconds)
+QUIZ_SESSION_TTL = config("QUIZ_SESSION_TTL", default=2 * 60 * 60, cast=int)
+
+# Quiz sessions older than this are moved to cold storage by archive_quiz_sessions
+QUIZ_ARCHIVE_AFTER_DAYS = config("QUIZ_ARCHIVE_AFTER_DAYS", default=365, cast=int)
+
+# Write endpoints accepting an Idempotency-Key header replay their first
+# response for this long (seconds)
+IDEMPOTENCY_KEY_TTL = config("IDEMPOTENCY_KEY_TTL", default=24 * 60 * 60, cast=int)
+
 # JWT Configuration
 from datetime import timedelta
 
@@ -166,6 +180,8 @@ SIMPLE_JWT = {
 }
 
 # CORS settings
+from corsheaders.defaults import default_headers
+
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
     "http://127.0.0.1:3000",
@@ -173,4 +189,6 @@ CORS_ALLOWED_ORIGINS = [
 
 CORS_ALLOW_CREDENTIALS = True
 
+CORS_ALLOW_HEADERS = (*default_headers, "idempotency-key")
+
 CORS_ALLOW_ALL_ORIGINS = DEBUG  # Only in development
@@ -0,0 +1,104 @@
+from django.core.exceptions import FieldDoesNotExist
+
+FIELDS_QUERY_PARAM = "fields"
+
+
+def requested_fields(request):
+    """Field names asked for with `?fields=a,b`, or None for all fields"""
+    if request is None or request.method != "GET":
+        return None
+    value = request.query_params.get(FIELDS_QUERY_PARAM)
+    if not value:
+        return None
+    return {name.strip() for name in value.split(",") if name.strip()}
+
+
+def model_field_path(model, source):
+    """Resolve a dotted serializer source to (ORM path, related paths).
+
+    Returns None unless every step is a forward relation ending in a
+    concrete field, e.g. "topic.name" -> ("topic__name", ["topic"]).
+    """
+    parts = source.split(".")
+    related = []
+    for position, part in enumerate(parts):
+        try:
+            field = model._meta.get_field(part)
+        except FieldDoesNotExist:
+            return None
+        if position == len(parts) - 1:
+            break
+        if not (field.many_to_one or field.one_to_one) or not field.concrete:
+            return None
+        related.append("__".join(parts[: position + 1]))
+        model = field.related_model
+
+    if not field.concrete:
+        return None
+    return "__".join(parts), related
+
+
+class SparseFieldsetSerializerMixin:
+    """Drop the fields a GET request did not ask for with `?fields=`.
+
+    Fields backed by a property or method rather than a column can name the
+    columns they read in `sparse_field_columns`, so views can still narrow
+    their queryset with SparseFieldsetViewMixin.
+    """
+
+    sparse_field_columns = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Only the top-level serializer is built with a context
+        fields = requested_fields(self._context.get("request"))
+        if fields and fields & set(self.fields):
+            for name in set(self.fields) - fields:
+                self.fields.pop(name)
+
+    def get_sparse_columns(self, model):
+        """ORM paths and select_related paths the remaining fields need.
+
+        Returns None if a field's data can't be traced back to columns.
+        """
+        columns = set()
+        related = set()
+        for name, field in self.fields.items():
+            if name in self.sparse_field_columns:
+                sources = self.sparse_field_columns[name]
+            else:
+                sources = [field.source]
+            for source in sources:
+                resolved = model_field_path(model, source)
+                if resolved is None:
+                    return None
+                path, relations = resolved
+                columns.add(path)
+                related.update(relations)
+        # The local foreign key has to be loaded to follow the join
+        columns.update(path.split("__")[0] for path in related)
+        return columns, related
+
+
+class SparseFieldsetViewMixin:
+    """Narrow the queryset to the columns and joins `?fields=` needs"""
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if requested_fields(self.request) is None:
+            return queryset
+
+        sparse_columns = self.get_serializer().get_sparse_columns(queryset.model)
+        if sparse_columns is None:
+            return queryset
+        columns, related = sparse_columns
+
+        # Keyset pagination reads its ordering column from the last row
+        ordering = getattr(self, "keyset_ordering", None)
+        if isinstance(ordering, str):
+            columns.add(ordering.lstrip("-"))
+
+        queryset = queryset.select_related(None)
+        if related:
+            queryset = queryset.select_related(*related)
+        return queryset.only(*columns)
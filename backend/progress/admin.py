@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import UserProgress
+from .models import UserProgress, UserTopicStats
 
 
 @admin.register(UserProgress)
@@ -13,3 +13,18 @@ class UserProgressAdmin(admin.ModelAdmin):
         return f"{obj.accuracy:.1f}%"
 
     accuracy.short_description = "Accuracy"
+
+
+@admin.register(UserTopicStats)
+class UserTopicStatsAdmin(admin.ModelAdmin):
+    list_display = (
+        "user",
+        "topic",
+        "mastered_count",
+        "learning_count",
+        "total_attempts",
+        "last_activity",
+    )
+    list_filter = ("topic",)
+    search_fields = ("user__email", "topic__name")
+    list_select_related = ("user", "topic")
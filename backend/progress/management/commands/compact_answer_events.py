@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from progress.models import AnswerEvent
+
+
+class Command(BaseCommand):
+    help = (
+        "Fold queued answer events into user progress. Meant to run "
+        "periodically, e.g. every minute from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=10000)
+        parser.add_argument(
+            "--max-batches", type=int, default=100, help="Stop after this many batches"
+        )
+
+    def handle(self, *args, **options):
+        consumed = 0
+        for _ in range(options["max_batches"]):
+            count = AnswerEvent.objects.compact(options["batch_size"])
+            if not count:
+                break
+            consumed += count
+
+        self.stdout.write(self.style.SUCCESS(f"Compacted {consumed} answer events"))
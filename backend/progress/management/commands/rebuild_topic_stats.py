@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from accounts.models import User
+from progress.models import UserTopicStats
+
+
+class Command(BaseCommand):
+    help = "Rebuild per-user topic progress rollups from user progress"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        user_ids = User.objects.order_by("id").values_list("id", flat=True)
+
+        rebuilt = 0
+        batch = []
+        for user_id in user_ids.iterator():
+            batch.append(user_id)
+            if len(batch) >= batch_size:
+                rebuilt += UserTopicStats.objects.rebuild(batch)
+                batch = []
+        if batch:
+            rebuilt += UserTopicStats.objects.rebuild(batch)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {rebuilt} topic progress rollups")
+        )
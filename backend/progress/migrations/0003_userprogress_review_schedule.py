@@ -0,0 +1,49 @@
+# Generated by Django 5.2.2 on 2026-10-17 13:30
+
+import datetime
+from django.conf import settings
+from django.db import migrations, models
+
+
+def schedule_existing_progress(apps, schema_editor):
+    UserProgress = apps.get_model("progress", "UserProgress")
+    UserProgress.objects.filter(total_attempts__gt=0).update(
+        interval_days=1,
+        next_review_at=models.F("last_studied") + datetime.timedelta(days=1),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('progress', '0002_answerevent'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprogress',
+            name='repetitions',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userprogress',
+            name='interval_days',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userprogress',
+            name='ease_factor',
+            field=models.FloatField(default=2.5),
+        ),
+        migrations.AddField(
+            model_name='userprogress',
+            name='next_review_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='userprogress',
+            index=models.Index(fields=['user', 'next_review_at'], name='progress_user_due_idx'),
+        ),
+        migrations.RunPython(schedule_existing_progress, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.2 on 2026-10-17 14:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_topic_stats(apps, schema_editor):
+    UserProgress = apps.get_model("progress", "UserProgress")
+    UserTopicStats = apps.get_model("progress", "UserTopicStats")
+    rows = (
+        UserProgress.objects.order_by()
+        .values("user", "topic")
+        .annotate(
+            not_started_count=models.Count(
+                "id", filter=models.Q(status="not_started")
+            ),
+            learning_count=models.Count("id", filter=models.Q(status="learning")),
+            mastered_count=models.Count("id", filter=models.Q(status="mastered")),
+            attempts=models.Sum("total_attempts"),
+            correct=models.Sum("correct_count"),
+            last_activity=models.Max("last_studied"),
+        )
+    )
+    UserTopicStats.objects.bulk_create(
+        (
+            UserTopicStats(
+                user_id=row["user"],
+                topic_id=row["topic"],
+                not_started_count=row["not_started_count"],
+                learning_count=row["learning_count"],
+                mastered_count=row["mastered_count"],
+                total_attempts=row["attempts"],
+                correct_count=row["correct"],
+                last_activity=row["last_activity"],
+            )
+            for row in rows.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('progress', '0003_userprogress_review_schedule'),
+        ('topics', '0002_topic_vocabulary_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserTopicStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('not_started_count', models.IntegerField(default=0)),
+                ('learning_count', models.IntegerField(default=0)),
+                ('mastered_count', models.IntegerField(default=0)),
+                ('total_attempts', models.IntegerField(default=0)),
+                ('correct_count', models.IntegerField(default=0)),
+                ('last_activity', models.DateTimeField(blank=True, null=True)),
+                ('topic', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='topics.topic')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'user topic stats',
+                'constraints': [models.UniqueConstraint(fields=('user', 'topic'), name='unique_user_topic_stats')],
+            },
+        ),
+        migrations.RunPython(backfill_topic_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.2 on 2026-10-17 14:30
+
+import django.db.models.expressions
+import django.db.models.functions.comparison
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('progress', '0004_usertopicstats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprogress',
+            name='accuracy',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(total_attempts=0, then=models.Value(0.0)), default=django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.functions.comparison.Cast('correct_count', models.FloatField()), '*', models.Value(100)), '/', models.F('total_attempts'))), output_field=models.FloatField()),
+        ),
+        migrations.AddIndex(
+            model_name='userprogress',
+            index=models.Index(fields=['user', 'accuracy'], name='progress_user_accuracy_idx'),
+        ),
+    ]
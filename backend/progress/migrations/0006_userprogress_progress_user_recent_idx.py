@@ -0,0 +1,19 @@
+# Generated by Django 5.2.2 on 2026-10-17 15:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('progress', '0005_userprogress_accuracy'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userprogress',
+            index=models.Index(fields=['user', '-last_studied'], name='progress_user_recent_idx'),
+        ),
+    ]
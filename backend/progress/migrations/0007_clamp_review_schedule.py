@@ -0,0 +1,28 @@
+# Generated by Django 5.2.2 on 2026-10-17 21:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('progress', '0006_userprogress_progress_user_recent_idx'),
+    ]
+
+    # Bring schedules grown past the new SM-2 bounds back within them
+    operations = [
+        migrations.RunSQL(
+            """
+            UPDATE progress_userprogress SET
+                interval_days = LEAST(interval_days, 36500),
+                ease_factor = LEAST(ease_factor, 3.0),
+                next_review_at = LEAST(
+                    next_review_at, last_studied + make_interval(days => 36500)
+                )
+            WHERE interval_days > 36500
+                OR ease_factor > 3.0
+                OR next_review_at > last_studied + make_interval(days => 36500)
+            """,
+            migrations.RunSQL.noop,
+        ),
+    ]
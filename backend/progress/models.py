@@ -1,10 +1,404 @@
-from django.db import models
+from django.db import models, connection, transaction
 from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models.functions import Cast
+from django.utils import timezone
 from topics.models import Topic
 from vocabulary.models import Vocabulary
 
 
+def mastery_status_sql(correct, attempts):
+    """SQL expression applying the mastery rule of UserProgress.update_progress"""
+    return (
+        f"CASE WHEN {attempts} >= {UserProgress.MASTERY_MIN_ATTEMPTS} "
+        f"AND {correct} * 100.0 / {attempts} >= {UserProgress.MASTERY_ACCURACY} "
+        "THEN 'mastered' ELSE 'learning' END"
+    )
+
+
+def review_schedule_sql(
+    passed, repetitions, interval, ease, reviewed_at, next_review=None
+):
+    """SQL expressions scheduling the next review with the SM-2 algorithm.
+
+    `passed` is a boolean SQL expression for the review outcome; the other
+    arguments are SQL expressions for the row's schedule before the review.
+    A correct answer counts as quality 5, a wrong one as quality 2. Given
+    the row's `next_review`, a correct answer before the word is due leaves
+    the schedule unchanged, so drilling a word can't inflate its interval.
+    """
+    new_interval = (
+        f"(CASE WHEN NOT {passed} OR {repetitions} = 0 THEN 1 "
+        f"WHEN {repetitions} = 1 THEN 6 "
+        f"ELSE LEAST(round({interval} * {ease}), "
+        f"{UserProgress.MAX_INTERVAL_DAYS})::int END)"
+    )
+    schedule = {
+        "repetitions": f"CASE WHEN {passed} THEN {repetitions} + 1 ELSE 0 END",
+        "interval_days": new_interval,
+        "ease_factor": (
+            f"LEAST({UserProgress.MAX_EASE_FACTOR}, "
+            f"GREATEST({UserProgress.MIN_EASE_FACTOR}, "
+            f"{ease} + CASE WHEN {passed} THEN 0.1 ELSE -0.32 END))"
+        ),
+        "next_review_at": f"{reviewed_at} + make_interval(days => {new_interval})",
+    }
+    if next_review is None:
+        return schedule
+
+    counts = (
+        f"(NOT {passed} OR {next_review} IS NULL OR {next_review} <= {reviewed_at})"
+    )
+    current = {
+        "repetitions": repetitions,
+        "interval_days": interval,
+        "ease_factor": ease,
+        "next_review_at": next_review,
+    }
+    return {
+        column: f"CASE WHEN {counts} THEN {value} ELSE {current[column]} END"
+        for column, value in schedule.items()
+    }
+
+
+def schedule_assignments_sql(schedule):
+    return ",\n".join(f"{column} = {value}" for column, value in schedule.items())
+
+
+def mastered_delta(previous_status, status):
+    """Change in the user's mastered word count caused by a status transition"""
+    return (status == "mastered") - (previous_status == "mastered")
+
+
+def status_deltas(previous_status, status):
+    """Per-status row count changes caused by a status transition"""
+    deltas = {status: 1}
+    if previous_status is not None:
+        deltas[previous_status] = deltas.get(previous_status, 0) - 1
+    return deltas
+
+
+def lock_user_progress(*user_ids):
+    """Lock the users' rows so their progress writes run one at a time.
+
+    Row locks on progress can't cover words answered for the first time,
+    so two concurrent first answers would both count as new. Taken first,
+    in id order, by every progress writer to keep the lock order consistent.
+    """
+    list(
+        get_user_model()
+        .objects.select_for_update()
+        .filter(pk__in=user_ids)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+
+
+def progress_upsert_cte():
+    """SQL for an `upserted` CTE folding answers into UserProgress.
+
+    Expects a preceding CTE named `answers` with user_id, vocabulary_id,
+    topic_id, attempts, correct and answered_at columns, holding at most one
+    row per (user_id, vocabulary_id). The CTE returns user_id, vocabulary_id,
+    topic_id and the new status of every row written.
+    """
+    table = UserProgress._meta.db_table
+    new_status = mastery_status_sql("a.correct", "a.attempts")
+    updated_status = mastery_status_sql(
+        "(p.correct_count + EXCLUDED.correct_count)",
+        "(p.total_attempts + EXCLUDED.total_attempts)",
+    )
+    # Several answers to one word in a batch count as one review, passed
+    # only if all of them were correct
+    new_schedule = review_schedule_sql(
+        "(a.correct = a.attempts)",
+        "0",
+        "0",
+        str(UserProgress.INITIAL_EASE_FACTOR),
+        "a.answered_at",
+    )
+    updated_schedule = review_schedule_sql(
+        "(EXCLUDED.correct_count = EXCLUDED.total_attempts)",
+        "p.repetitions",
+        "p.interval_days",
+        "p.ease_factor",
+        "EXCLUDED.last_studied",
+        "p.next_review_at",
+    )
+    return f"""
+        upserted AS (
+            INSERT INTO {table} AS p (
+                user_id, vocabulary_id, topic_id, status, correct_count,
+                total_attempts, last_studied, created_at,
+                {", ".join(new_schedule)}
+            )
+            SELECT a.user_id, a.vocabulary_id, a.topic_id, {new_status},
+                a.correct, a.attempts, a.answered_at, a.answered_at,
+                {", ".join(new_schedule.values())}
+            FROM answers a
+            ON CONFLICT (user_id, vocabulary_id) DO UPDATE SET
+                correct_count = p.correct_count + EXCLUDED.correct_count,
+                total_attempts = p.total_attempts + EXCLUDED.total_attempts,
+                status = {updated_status},
+                last_studied = GREATEST(p.last_studied, EXCLUDED.last_studied),
+                {schedule_assignments_sql(updated_schedule)}
+            RETURNING p.user_id, p.vocabulary_id, p.topic_id, p.status
+        )
+    """
+
+
+class UserProgressManager(models.Manager):
+    def record_answers(self, user, answers):
+        """Apply many (vocabulary_id, is_correct) answers in one upsert.
+
+        Returns (vocabulary_id, previous_status, status) for every row written;
+        previous_status is None for rows that did not exist yet. The user's
+        words_learned count and topic rollups are adjusted for the status
+        transitions.
+        """
+        attempts = {}
+        correct = {}
+        for vocabulary_id, is_correct in answers:
+            vocabulary_id = int(vocabulary_id)
+            attempts[vocabulary_id] = attempts.get(vocabulary_id, 0) + 1
+            correct[vocabulary_id] = correct.get(vocabulary_id, 0) + int(is_correct)
+
+        topics = dict(
+            Vocabulary.objects.filter(id__in=attempts).values_list("id", "topic_id")
+        )
+        if not topics:
+            return []
+
+        vocabulary_ids = list(topics)
+        answered_at = timezone.now()
+        sql = f"""
+            WITH answers AS (
+                SELECT %s::bigint AS user_id, a.vocabulary_id, a.topic_id,
+                    a.attempts, a.correct, %s::timestamptz AS answered_at
+                FROM unnest(%s::bigint[], %s::bigint[], %s::int[], %s::int[])
+                    AS a (vocabulary_id, topic_id, attempts, correct)
+            ), {progress_upsert_cte()}
+            SELECT vocabulary_id, status FROM upserted
+        """
+        params = [
+            user.pk,
+            answered_at,
+            vocabulary_ids,
+            [topics[vocabulary_id] for vocabulary_id in vocabulary_ids],
+            [attempts[vocabulary_id] for vocabulary_id in vocabulary_ids],
+            [correct[vocabulary_id] for vocabulary_id in vocabulary_ids],
+        ]
+
+        with transaction.atomic():
+            lock_user_progress(user.pk)
+            # Lock existing rows so the previous statuses stay accurate
+            previous = dict(
+                self.select_for_update()
+                .filter(user=user, vocabulary_id__in=vocabulary_ids)
+                .values_list("vocabulary_id", "status")
+            )
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                rows = cursor.fetchall()
+
+            results = [
+                (vocabulary_id, previous.get(vocabulary_id), status)
+                for vocabulary_id, status in rows
+            ]
+            words_learned = sum(
+                mastered_delta(previous_status, status)
+                for _, previous_status, status in results
+            )
+            if words_learned:
+                user.apply_learning_stats_delta(words_learned=words_learned)
+
+            topic_deltas = {}
+            for vocabulary_id, previous_status, status in results:
+                deltas = topic_deltas.setdefault(topics[vocabulary_id], {})
+                deltas["attempts"] = deltas.get("attempts", 0) + attempts[vocabulary_id]
+                deltas["correct"] = deltas.get("correct", 0) + correct[vocabulary_id]
+                for key, delta in status_deltas(previous_status, status).items():
+                    deltas[key] = deltas.get(key, 0) + delta
+            UserTopicStats.objects.apply_deltas(user.pk, topic_deltas, answered_at)
+
+        return results
+
+
+class AnswerEventManager(models.Manager):
+    def compact(self, batch_size):
+        """Fold up to `batch_size` of the oldest events into UserProgress.
+
+        The events are consumed, aggregated per (user, vocabulary) and upserted
+        with set-based SQL; the affected users' words_learned and topic rollups
+        are recounted while their rows are locked.
+        Returns the number of events consumed.
+        """
+        events = self.model._meta.db_table
+        vocabulary = Vocabulary._meta.db_table
+        progress = UserProgress._meta.db_table
+        users = get_user_model()._meta.db_table
+        claim_sql = f"""
+            SELECT id, user_id FROM {events}
+            ORDER BY id
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+        """
+        sql = f"""
+            WITH batch AS (
+                DELETE FROM {events}
+                WHERE id = ANY(%s)
+                RETURNING user_id, vocabulary_id, is_correct, answered_at
+            ), answers AS (
+                SELECT b.user_id, b.vocabulary_id, v.topic_id,
+                    count(*) AS attempts,
+                    count(*) FILTER (WHERE b.is_correct) AS correct,
+                    max(b.answered_at) AS answered_at
+                FROM batch b
+                JOIN {vocabulary} v ON v.id = b.vocabulary_id
+                GROUP BY b.user_id, b.vocabulary_id, v.topic_id
+            ), {progress_upsert_cte()}
+            SELECT array_agg(user_id), array_agg(topic_id)
+            FROM (SELECT DISTINCT user_id, topic_id FROM upserted) AS touched
+        """
+        recount_sql = f"""
+            UPDATE {users} u SET words_learned = (
+                SELECT count(*) FROM {progress} p
+                WHERE p.user_id = u.id AND p.status = 'mastered'
+            )
+            WHERE u.id = ANY(%s)
+        """
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(claim_sql, [batch_size])
+            claimed = cursor.fetchall()
+            if not claimed:
+                return 0
+
+            # Like the other progress writers, lock the users before their
+            # progress rows. Nobody else can then write their progress, so
+            # the recounts below can't overwrite a concurrent delta.
+            lock_user_progress(*{user_id for _, user_id in claimed})
+            cursor.execute(sql, [[event_id for event_id, _ in claimed]])
+            user_ids, topic_ids = cursor.fetchone()
+            if user_ids:
+                cursor.execute(recount_sql, [sorted(set(user_ids))])
+                UserTopicStats.objects.recount(user_ids, topic_ids)
+        return len(claimed)
+
+
+class UserTopicStatsManager(models.Manager):
+    def apply_deltas(self, user_id, topic_deltas, last_activity):
+        """Add count changes to a user's topic rollups in one upsert.
+
+        `topic_deltas` maps topic ids to dicts of changes keyed by status,
+        "attempts" and "correct"; missing keys count as no change.
+        """
+        if not topic_deltas:
+            return
+
+        topic_ids = list(topic_deltas)
+        columns = {
+            "not_started_count": "not_started",
+            "learning_count": "learning",
+            "mastered_count": "mastered",
+            "total_attempts": "attempts",
+            "correct_count": "correct",
+        }
+        table = self.model._meta.db_table
+        increments = ", ".join(
+            f"{column} = s.{column} + EXCLUDED.{column}" for column in columns
+        )
+        sql = f"""
+            INSERT INTO {table} AS s (
+                user_id, topic_id, {", ".join(columns)}, last_activity
+            )
+            SELECT %s, d.*, %s
+            FROM unnest(%s::bigint[], {", ".join(["%s::int[]"] * len(columns))})
+                AS d (topic_id, {", ".join(columns)})
+            ON CONFLICT (user_id, topic_id) DO UPDATE SET
+                {increments},
+                last_activity = GREATEST(s.last_activity, EXCLUDED.last_activity)
+        """
+        params = [user_id, last_activity, topic_ids] + [
+            [topic_deltas[topic_id].get(key, 0) for topic_id in topic_ids]
+            for key in columns.values()
+        ]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+
+    def recount(self, user_ids, topic_ids):
+        """Recompute the rollups of the given (user, topic) pairs from progress"""
+        progress = UserProgress._meta.db_table
+        sql = f"""
+            {self._rollup_insert_sql()}
+            SELECT {self._rollup_select_sql()}
+            FROM {progress} p
+            JOIN unnest(%s::bigint[], %s::bigint[]) AS k (user_id, topic_id)
+                ON p.user_id = k.user_id AND p.topic_id = k.topic_id
+            GROUP BY p.user_id, p.topic_id
+            {self._rollup_conflict_sql()}
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [list(user_ids), list(topic_ids)])
+
+    def rebuild(self, user_ids):
+        """Recompute every rollup of the given users; returns the rows written"""
+        progress = UserProgress._meta.db_table
+        sql = f"""
+            {self._rollup_insert_sql()}
+            SELECT {self._rollup_select_sql()}
+            FROM {progress} p
+            WHERE p.user_id = ANY(%s)
+            GROUP BY p.user_id, p.topic_id
+            {self._rollup_conflict_sql()}
+        """
+        with transaction.atomic():
+            self.filter(user_id__in=user_ids).delete()
+            with connection.cursor() as cursor:
+                cursor.execute(sql, [list(user_ids)])
+                return cursor.rowcount
+
+    def _rollup_insert_sql(self):
+        return f"""
+            INSERT INTO {self.model._meta.db_table} (
+                user_id, topic_id, not_started_count, learning_count,
+                mastered_count, total_attempts, correct_count, last_activity
+            )
+        """
+
+    def _rollup_select_sql(self):
+        return """
+            p.user_id, p.topic_id,
+            count(*) FILTER (WHERE p.status = 'not_started'),
+            count(*) FILTER (WHERE p.status = 'learning'),
+            count(*) FILTER (WHERE p.status = 'mastered'),
+            sum(p.total_attempts), sum(p.correct_count), max(p.last_studied)
+        """
+
+    def _rollup_conflict_sql(self):
+        columns = [
+            "not_started_count",
+            "learning_count",
+            "mastered_count",
+            "total_attempts",
+            "correct_count",
+            "last_activity",
+        ]
+        assignments = ", ".join(f"{column} = EXCLUDED.{column}" for column in columns)
+        return f"ON CONFLICT (user_id, topic_id) DO UPDATE SET {assignments}"
+
+
 class UserProgress(models.Model):
+    # A word is mastered once answered at least this often with this accuracy
+    MASTERY_ACCURACY = 80
+    MASTERY_MIN_ATTEMPTS = 3
+
+    # SM-2 ease factor bounds for spaced repetition
+    INITIAL_EASE_FACTOR = 2.5
+    MIN_EASE_FACTOR = 1.3
+    MAX_EASE_FACTOR = 3.0
+    # Keeps next_review_at far from the timestamp range limit
+    MAX_INTERVAL_DAYS = 36500
+
     STATUS_CHOICES = [
         ("not_started", "Not Started"),
         ("learning", "Learning"),
@@ -22,32 +416,159 @@ class UserProgress(models.Model):
     last_studied = models.DateTimeField(auto_now=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Spaced repetition schedule (SM-2), maintained in SQL on every answer
+    repetitions = models.IntegerField(default=0)
+    interval_days = models.IntegerField(default=0)
+    ease_factor = models.FloatField(default=INITIAL_EASE_FACTOR)
+    next_review_at = models.DateTimeField(null=True, blank=True)
+
+    # Stored so weak-word lists can filter and sort in SQL
+    accuracy = models.GeneratedField(
+        expression=models.Case(
+            models.When(total_attempts=0, then=models.Value(0.0)),
+            default=(
+                Cast("correct_count", models.FloatField())
+                * 100
+                / models.F("total_attempts")
+            ),
+        ),
+        output_field=models.FloatField(),
+        db_persist=True,
+    )
+
+    objects = UserProgressManager()
+
     class Meta:
         unique_together = ["user", "vocabulary"]
         ordering = ["-last_studied"]
+        indexes = [
+            models.Index(
+                fields=["user", "next_review_at"], name="progress_user_due_idx"
+            ),
+            models.Index(
+                fields=["user", "accuracy"], name="progress_user_accuracy_idx"
+            ),
+            models.Index(
+                fields=["user", "-last_studied"], name="progress_user_recent_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.name} - {self.vocabulary.word} ({self.status})"
 
-    @property
-    def accuracy(self):
-        if self.total_attempts == 0:
-            return 0
-        return (self.correct_count / self.total_attempts) * 100
-
     def update_progress(self, is_correct):
-        """Update progress based on answer correctness"""
-        self.total_attempts += 1
-        if is_correct:
-            self.correct_count += 1
+        """Record one answer with a single atomic UPDATE ... RETURNING.
+
+        Counters are incremented and the mastery rule evaluated in SQL, so
+        concurrent answers for the same word can't overwrite each other.
+        """
+        table = self._meta.db_table
+        correct = int(bool(is_correct))
+        status = mastery_status_sql(
+            f"(p.correct_count + {correct})", "(p.total_attempts + 1)"
+        )
+        schedule = review_schedule_sql(
+            "TRUE" if correct else "FALSE",
+            "p.repetitions",
+            "p.interval_days",
+            "p.ease_factor",
+            "previous.reviewed_at",
+            "p.next_review_at",
+        )
+        sql = f"""
+            UPDATE {table} AS p SET
+                total_attempts = p.total_attempts + 1,
+                correct_count = p.correct_count + {correct},
+                status = {status},
+                last_studied = previous.reviewed_at,
+                {schedule_assignments_sql(schedule)}
+            FROM (
+                SELECT id, status, %s::timestamptz AS reviewed_at
+                FROM {table} WHERE id = %s FOR UPDATE
+            ) AS previous
+            WHERE p.id = previous.id
+            RETURNING previous.status, p.status, p.correct_count, p.total_attempts,
+                p.last_studied, p.repetitions, p.interval_days, p.ease_factor,
+                p.next_review_at, p.accuracy
+        """
+        with transaction.atomic():
+            lock_user_progress(self.user_id)
+            with connection.cursor() as cursor:
+                cursor.execute(sql, [timezone.now(), self.pk])
+                row = cursor.fetchone()
+            if row is None:
+                raise UserProgress.DoesNotExist("Progress row no longer exists")
+
+            (
+                previous_status,
+                self.status,
+                self.correct_count,
+                self.total_attempts,
+                self.last_studied,
+                self.repetitions,
+                self.interval_days,
+                self.ease_factor,
+                self.next_review_at,
+                self.accuracy,
+            ) = row
+
+            # Update user's learning statistics and the topic rollup
+            words_learned = mastered_delta(previous_status, self.status)
+            if words_learned:
+                self.user.apply_learning_stats_delta(words_learned=words_learned)
+            deltas = status_deltas(previous_status, self.status)
+            deltas.update(attempts=1, correct=correct)
+            UserTopicStats.objects.apply_deltas(
+                self.user_id, {self.topic_id: deltas}, self.last_studied
+            )
 
-        # Update status based on accuracy
-        if self.accuracy >= 80 and self.total_attempts >= 3:
-            self.status = "mastered"
-        elif self.total_attempts > 0:
-            self.status = "learning"
 
-        self.save()
+class AnswerEvent(models.Model):
+    """An answer waiting to be folded into UserProgress by the compactor"""
 
-        # Update user's learning statistics
-        self.user.update_learning_stats()
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    # Not a foreign key so ingestion stays a plain append; unknown ids are
+    # dropped during compaction
+    vocabulary_id = models.BigIntegerField()
+    is_correct = models.BooleanField()
+    answered_at = models.DateTimeField()
+
+    objects = AnswerEventManager()
+
+    def __str__(self):
+        return f"{self.user_id} - {self.vocabulary_id} ({self.is_correct})"
+
+
+class UserTopicStats(models.Model):
+    """Rollup of a user's progress rows in one topic, maintained on write.
+
+    Counts only cover words the user has a progress row for; words never
+    answered are not_started by definition. Rebuild with
+    `manage.py rebuild_topic_stats` if it ever drifts.
+    """
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    topic = models.ForeignKey(Topic, on_delete=models.CASCADE)
+    not_started_count = models.IntegerField(default=0)
+    learning_count = models.IntegerField(default=0)
+    mastered_count = models.IntegerField(default=0)
+    total_attempts = models.IntegerField(default=0)
+    correct_count = models.IntegerField(default=0)
+    last_activity = models.DateTimeField(null=True, blank=True)
+
+    objects = UserTopicStatsManager()
+
+    class Meta:
+        verbose_name_plural = "user topic stats"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "topic"], name="unique_user_topic_stats"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.topic_id} ({self.mastered_count} mastered)"
+
+    @property
+    def tracked_count(self):
+        return self.not_started_count + self.learning_count + self.mastered_count
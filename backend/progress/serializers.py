@@ -1,8 +1,11 @@
 from rest_framework import serializers
+from config.sparse_fields import SparseFieldsetSerializerMixin
 from .models import UserProgress
 
 
-class UserProgressSerializer(serializers.ModelSerializer):
+class UserProgressSerializer(
+    SparseFieldsetSerializerMixin, serializers.ModelSerializer
+):
     vocabulary_word = serializers.CharField(source="vocabulary.word", read_only=True)
     vocabulary_pronunciation = serializers.CharField(
         source="vocabulary.pronunciation", read_only=True
@@ -38,5 +41,29 @@ class UserProgressSerializer(serializers.ModelSerializer):
             "total_attempts",
             "accuracy",
             "last_studied",
+            "interval_days",
+            "ease_factor",
+            "next_review_at",
         ]
-        read_only_fields = ["id", "last_studied"]
+        read_only_fields = [
+            "id",
+            "last_studied",
+            "interval_days",
+            "ease_factor",
+            "next_review_at",
+        ]
+
+
+class ProgressUpdateSerializer(serializers.Serializer):
+    vocabulary_id = serializers.IntegerField()
+    is_correct = serializers.BooleanField(default=False)
+
+
+class AnswerEventSerializer(serializers.Serializer):
+    vocabulary_id = serializers.IntegerField()
+    is_correct = serializers.BooleanField()
+    answered_at = serializers.DateTimeField(required=False)
+
+
+class AnswerEventBatchSerializer(serializers.Serializer):
+    events = AnswerEventSerializer(many=True, allow_empty=False, max_length=500)
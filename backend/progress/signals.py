@@ -0,0 +1,27 @@
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from .models import UserProgress, UserTopicStats
+
+
+@receiver(post_delete, sender=UserProgress)
+def progress_deleted(sender, instance, **kwargs):
+    """Keep incrementally maintained counts right when progress rows go away.
+
+    Also fires for rows removed by cascade, e.g. when a word is deleted.
+    Only plain UPDATEs are issued: they are no-ops if the user or topic is
+    being deleted too, where an upsert could recreate rows pointing at them.
+    """
+    if instance.status == "mastered":
+        get_user_model().objects.filter(pk=instance.user_id).update(
+            words_learned=F("words_learned") - 1
+        )
+
+    UserTopicStats.objects.filter(
+        user_id=instance.user_id, topic_id=instance.topic_id
+    ).update(
+        **{f"{instance.status}_count": F(f"{instance.status}_count") - 1},
+        total_attempts=F("total_attempts") - instance.total_attempts,
+        correct_count=F("correct_count") - instance.correct_count,
+    )
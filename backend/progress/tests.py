@@ -1,3 +1,267 @@
+from datetime import timedelta
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from accounts.models import IdempotencyKey, User
+from topics.models import Topic
+from vocabulary.models import Vocabulary
+from .models import UserProgress, UserTopicStats
 
-# Create your tests here.
+
+def create_user(name="learner"):
+    return User.objects.create_user(
+        email=f"{name}@example.com", username=name, password="password"
+    )
+
+
+def create_word(topic, word):
+    return Vocabulary.objects.create(
+        topic=topic, word=word, pronunciation=word, meaning=word, example=word
+    )
+
+
+class ProgressTestCase(TestCase):
+    def setUp(self):
+        self.user = create_user()
+        self.topic = Topic.objects.create(name="Animals", description="Animals")
+        self.word = create_word(self.topic, "cat")
+
+    def progress(self):
+        return UserProgress.objects.get(user=self.user, vocabulary=self.word)
+
+    def make_due(self):
+        UserProgress.objects.filter(user=self.user).update(
+            next_review_at=timezone.now() - timedelta(minutes=1)
+        )
+
+    def assertSchedule(self, progress, repetitions, interval_days, ease_factor):
+        self.assertEqual(progress.repetitions, repetitions)
+        self.assertEqual(progress.interval_days, interval_days)
+        self.assertAlmostEqual(progress.ease_factor, ease_factor)
+        self.assertAlmostEqual(
+            progress.next_review_at,
+            progress.last_studied + timedelta(days=interval_days),
+            delta=timedelta(seconds=1),
+        )
+
+
+class RecordAnswersTests(ProgressTestCase):
+    def answer(self, is_correct, word=None):
+        return UserProgress.objects.record_answers(
+            self.user, [((word or self.word).id, is_correct)]
+        )
+
+    def test_first_answer_creates_a_learning_row(self):
+        results = self.answer(True)
+
+        self.assertEqual(results, [(self.word.id, None, "learning")])
+        progress = self.progress()
+        self.assertEqual((progress.correct_count, progress.total_attempts), (1, 1))
+        self.assertSchedule(progress, 1, 1, 2.6)
+
+    def test_word_is_mastered_after_three_attempts_at_80_percent(self):
+        self.answer(True)
+        self.answer(True)
+        results = self.answer(True)
+
+        self.assertEqual(results, [(self.word.id, "learning", "mastered")])
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.words_learned, 1)
+
+        # 3 of 4 correct is below 80%
+        results = self.answer(False)
+        self.assertEqual(results, [(self.word.id, "mastered", "learning")])
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.words_learned, 0)
+
+    def test_one_batch_counts_every_answer(self):
+        other = create_word(self.topic, "dog")
+        results = UserProgress.objects.record_answers(
+            self.user,
+            [(self.word.id, True), (self.word.id, True), (self.word.id, True)]
+            + [(other.id, True), (other.id, False)],
+        )
+
+        self.assertEqual(
+            sorted(results),
+            sorted([(self.word.id, None, "mastered"), (other.id, None, "learning")]),
+        )
+        # Only the all-correct word passed its review
+        self.assertSchedule(self.progress(), 1, 1, 2.6)
+        other_progress = UserProgress.objects.get(user=self.user, vocabulary=other)
+        self.assertSchedule(other_progress, 0, 1, 2.18)
+
+    def test_reviews_follow_sm2_when_due(self):
+        self.answer(True)
+        self.make_due()
+        self.answer(True)
+        self.assertSchedule(self.progress(), 2, 6, 2.7)
+
+        self.make_due()
+        self.answer(True)
+        # round(6 * 2.7)
+        self.assertSchedule(self.progress(), 3, 16, 2.8)
+
+        self.answer(False)
+        self.assertSchedule(self.progress(), 0, 1, 2.48)
+
+    def test_correct_answer_before_due_keeps_the_schedule(self):
+        self.answer(True)
+        before = self.progress()
+
+        self.answer(True)
+
+        progress = self.progress()
+        self.assertEqual(progress.total_attempts, 2)
+        self.assertEqual(progress.next_review_at, before.next_review_at)
+        self.assertSchedule(progress, 1, 1, 2.6)
+
+    def test_ease_factor_is_clamped(self):
+        for _ in range(10):
+            self.answer(False)
+        self.assertAlmostEqual(self.progress().ease_factor, 1.3)
+
+        for _ in range(20):
+            self.make_due()
+            self.answer(True)
+        self.assertAlmostEqual(self.progress().ease_factor, 3.0)
+
+    def test_unknown_vocabulary_is_ignored(self):
+        self.assertEqual(self.answer(True, Vocabulary(id=0)), [])
+        self.assertFalse(UserProgress.objects.exists())
+
+    def test_topic_rollup_follows_status_changes(self):
+        for is_correct in (True, True, True, False):
+            self.answer(is_correct)
+
+        stats = UserTopicStats.objects.get(user=self.user, topic=self.topic)
+        self.assertEqual((stats.learning_count, stats.mastered_count), (1, 0))
+        self.assertEqual((stats.total_attempts, stats.correct_count), (4, 3))
+
+
+class UpdateProgressTests(ProgressTestCase):
+    def setUp(self):
+        super().setUp()
+        UserProgress.objects.record_answers(self.user, [(self.word.id, True)])
+
+    def answer(self, is_correct):
+        progress = self.progress()
+        progress.update_progress(is_correct)
+        return progress
+
+    def test_counts_and_mastery_are_updated(self):
+        self.answer(True)
+        progress = self.answer(True)
+
+        self.assertEqual(progress.status, "mastered")
+        self.assertEqual((progress.correct_count, progress.total_attempts), (3, 3))
+        self.assertEqual(progress.accuracy, 100.0)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.words_learned, 1)
+
+        progress = self.answer(False)
+        self.assertEqual(progress.status, "learning")
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.words_learned, 0)
+
+        stats = UserTopicStats.objects.get(user=self.user, topic=self.topic)
+        self.assertEqual((stats.learning_count, stats.mastered_count), (1, 0))
+        self.assertEqual((stats.total_attempts, stats.correct_count), (4, 3))
+
+    def test_returned_row_matches_the_database(self):
+        self.make_due()
+        progress = self.answer(True)
+
+        stored = self.progress()
+        for field in ("repetitions", "interval_days", "next_review_at", "status"):
+            self.assertEqual(getattr(progress, field), getattr(stored, field))
+        self.assertSchedule(progress, 2, 6, 2.7)
+
+    def test_schedule_only_moves_when_due_or_wrong(self):
+        progress = self.answer(True)
+        self.assertSchedule(progress, 1, 1, 2.6)
+
+        self.make_due()
+        progress = self.answer(True)
+        self.assertSchedule(progress, 2, 6, 2.7)
+
+        progress = self.answer(False)
+        self.assertSchedule(progress, 0, 1, 2.38)
+
+
+class IdempotentProgressUpdateTests(ProgressTestCase):
+    url = "/api/progress/update/"
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def post(self, data, key="retry-1"):
+        return self.client.post(self.url, data, format="json", HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_the_stored_response(self):
+        data = {"vocabulary_id": self.word.id, "is_correct": True}
+        first = self.post(data)
+        retry = self.post(data)
+
+        self.assertEqual(first.status_code, 200)
+        self.assertNotIn("Idempotent-Replayed", first)
+        self.assertEqual(retry.status_code, 200)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(retry.json(), first.json())
+        # The answer was recorded once
+        self.assertEqual(self.progress().total_attempts, 1)
+
+    def test_different_keys_are_separate_requests(self):
+        data = {"vocabulary_id": self.word.id, "is_correct": True}
+        self.post(data, key="retry-1")
+        self.post(data, key="retry-2")
+
+        self.assertEqual(self.progress().total_attempts, 2)
+
+    def test_key_reused_for_another_body_is_rejected(self):
+        self.post({"vocabulary_id": self.word.id, "is_correct": True})
+        response = self.post({"vocabulary_id": self.word.id, "is_correct": False})
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(self.progress().total_attempts, 1)
+
+    def test_key_in_progress_is_a_conflict(self):
+        IdempotencyKey.objects.create(
+            user=self.user,
+            endpoint=self.url,
+            key="retry-1",
+            fingerprint="",
+            response_status=None,
+            expires_at=timezone.now() + timedelta(minutes=1),
+        )
+
+        response = self.post({"vocabulary_id": self.word.id, "is_correct": True})
+
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(UserProgress.objects.exists())
+
+    def test_abandoned_claim_is_taken_over(self):
+        IdempotencyKey.objects.create(
+            user=self.user,
+            endpoint=self.url,
+            key="retry-1",
+            fingerprint="",
+            response_status=None,
+            expires_at=timezone.now() - timedelta(seconds=1),
+        )
+
+        response = self.post({"vocabulary_id": self.word.id, "is_correct": True})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.progress().total_attempts, 1)
+
+    def test_client_errors_are_stored_and_replayed(self):
+        data = {"vocabulary_id": 0, "is_correct": True}
+        self.assertEqual(self.post(data).status_code, 404)
+
+        retry = self.post(data)
+
+        self.assertEqual(retry.status_code, 404)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
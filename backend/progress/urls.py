@@ -1,9 +1,23 @@
 from django.urls import path
-from .views import UserProgressListView, update_progress, topic_progress_summary
+from .views import (
+    UserProgressListView,
+    DueReviewListView,
+    update_progress,
+    ingest_answer_events,
+    topic_progress_summary,
+    all_topics_progress_summary,
+)
 
 urlpatterns = [
     path("", UserProgressListView.as_view(), name="user-progress-list"),
+    path("due/", DueReviewListView.as_view(), name="due-reviews"),
     path("update/", update_progress, name="update-progress"),
+    path("events/", ingest_answer_events, name="ingest-answer-events"),
+    path(
+        "topics/summary/",
+        all_topics_progress_summary,
+        name="all-topics-progress-summary",
+    ),
     path(
         "topic/<int:topic_id>/summary/",
         topic_progress_summary,
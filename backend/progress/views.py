@@ -1,21 +1,56 @@
 from rest_framework import generics, permissions, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from django.db.models import Count, Q
-from .models import UserProgress
-from .serializers import UserProgressSerializer
+from django.db.models import F, FilteredRelation, Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from .models import UserProgress, UserTopicStats, AnswerEvent
+from .serializers import (
+    UserProgressSerializer,
+    ProgressUpdateSerializer,
+    AnswerEventBatchSerializer,
+)
 from topics.models import Topic
-from vocabulary.models import Vocabulary
+from config.idempotency import idempotent
+from config.pagination import KeysetPagination
+from config.sparse_fields import SparseFieldsetViewMixin
 
 
-class UserProgressListView(generics.ListAPIView):
+class UserProgressListView(SparseFieldsetViewMixin, generics.ListAPIView):
+    """The user's progress rows, optionally filtered, ordered and limited.
+
+    Query parameters: topic_id, status, min_accuracy, max_accuracy,
+    ordering (one of ORDERINGS) and limit. E.g. the 20 weakest words are
+    `?status=learning&ordering=accuracy&limit=20`. With `?pagination=cursor`
+    the list is paged instead of limited.
+    """
+
     serializer_class = UserProgressSerializer
     permission_classes = [permissions.IsAuthenticated]
-    pagination_class = None  # Disable pagination for user progress
+    pagination_class = KeysetPagination
+    # Filtering and ordering are handled by the query parameters below
+    filter_backends = []
+
+    ORDERINGS = (
+        "accuracy",
+        "-accuracy",
+        "last_studied",
+        "-last_studied",
+        "total_attempts",
+        "-total_attempts",
+    )
+    MAX_LIMIT = 100
+
+    @property
+    def keyset_ordering(self):
+        ordering = self.request.query_params.get("ordering")
+        return ordering if ordering in self.ORDERINGS else "-last_studied"
 
     def get_queryset(self):
         user = self.request.user
-        topic_id = self.request.query_params.get("topic_id")
+        params = self.request.query_params
+        topic_id = params.get("topic_id")
+        progress_status = params.get("status")
 
         queryset = UserProgress.objects.filter(user=user).select_related(
             "vocabulary", "topic"
@@ -23,75 +58,212 @@ class UserProgressListView(generics.ListAPIView):
 
         if topic_id:
             queryset = queryset.filter(topic_id=topic_id)
+        if progress_status in dict(UserProgress.STATUS_CHOICES):
+            queryset = queryset.filter(status=progress_status)
+
+        # Accuracy is a stored column, so these use the (user, accuracy) index
+        for param, lookup in (("min_accuracy", "gte"), ("max_accuracy", "lte")):
+            try:
+                value = float(params[param])
+            except (KeyError, ValueError):
+                continue
+            queryset = queryset.filter(**{f"accuracy__{lookup}": value})
 
-        return queryset
+        ordering = params.get("ordering")
+        if ordering in self.ORDERINGS:
+            queryset = queryset.order_by(ordering, "id")
+
+        if self.paginator.is_requested(self.request):
+            return queryset
+        try:
+            limit = min(int(params["limit"]), self.MAX_LIMIT)
+        except (KeyError, ValueError):
+            return queryset
+        return queryset[: max(limit, 0)]
+
+
+class DueReviewListView(SparseFieldsetViewMixin, generics.ListAPIView):
+    """The user's next N words due for review, soonest first"""
+
+    serializer_class = UserProgressSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = None
+
+    def get_queryset(self):
+        try:
+            limit = max(min(int(self.request.query_params.get("limit", 20)), 100), 1)
+        except ValueError:
+            limit = 20
+
+        # Range scan on the (user, next_review_at) index
+        return (
+            UserProgress.objects.filter(
+                user=self.request.user, next_review_at__lte=timezone.now()
+            )
+            .select_related("vocabulary", "topic")
+            .order_by("next_review_at")[:limit]
+        )
 
 
 @api_view(["POST"])
 @permission_classes([permissions.IsAuthenticated])
+@idempotent
 def update_progress(request):
     user = request.user
-    vocabulary_id = request.data.get("vocabulary_id")
-    is_correct = request.data.get("is_correct", False)
-
-    try:
-        vocabulary = Vocabulary.objects.get(id=vocabulary_id)
-    except Vocabulary.DoesNotExist:
+    serializer = ProgressUpdateSerializer(data=request.data)
+    if not serializer.is_valid():
         return Response(
-            {"error": "Vocabulary not found"}, status=status.HTTP_404_NOT_FOUND
+            {"error": "Invalid data", "details": serializer.errors},
+            status=status.HTTP_400_BAD_REQUEST,
         )
+    vocabulary_id = serializer.validated_data["vocabulary_id"]
+    is_correct = serializer.validated_data["is_correct"]
 
-    progress, created = UserProgress.objects.get_or_create(
-        user=user, vocabulary=vocabulary, defaults={"topic": vocabulary.topic}
-    )
+    progress_rows = UserProgress.objects.select_related("vocabulary", "topic")
+    progress = progress_rows.filter(user=user, vocabulary_id=vocabulary_id).first()
+    if progress is not None:
+        progress.user = user
+        try:
+            # One UPDATE ... RETURNING; the row comes back already refreshed
+            progress.update_progress(is_correct)
+        except UserProgress.DoesNotExist:
+            # Deleted meanwhile; record the answer as a first attempt below
+            progress = None
 
-    progress.update_progress(is_correct)
+    if progress is None:
+        # Single upsert; nothing is written for unknown vocabulary
+        if not UserProgress.objects.record_answers(user, [(vocabulary_id, is_correct)]):
+            return Response(
+                {"error": "Vocabulary not found"}, status=status.HTTP_404_NOT_FOUND
+            )
+        progress = progress_rows.get(user=user, vocabulary_id=vocabulary_id)
 
     return Response(
         {"success": True, "progress": UserProgressSerializer(progress).data}
     )
 
 
-@api_view(["GET"])
+@api_view(["POST"])
 @permission_classes([permissions.IsAuthenticated])
-def topic_progress_summary(request, topic_id):
-    user = request.user
+def ingest_answer_events(request):
+    """Queue a batch of answers; the compactor folds them into progress later"""
+    serializer = AnswerEventBatchSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(
+            {"error": "Invalid data", "details": serializer.errors},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
 
-    try:
-        topic = Topic.objects.get(id=topic_id)
-    except Topic.DoesNotExist:
-        return Response({"error": "Topic not found"}, status=status.HTTP_404_NOT_FOUND)
+    now = timezone.now()
+    events = AnswerEvent.objects.bulk_create(
+        [
+            AnswerEvent(
+                user=request.user,
+                vocabulary_id=event["vocabulary_id"],
+                is_correct=event["is_correct"],
+                answered_at=event.get("answered_at", now),
+            )
+            for event in serializer.validated_data["events"]
+        ]
+    )
 
-    # Get all vocabulary in this topic
-    total_vocabulary = Vocabulary.objects.filter(topic=topic).count()
+    return Response({"accepted": len(events)}, status=status.HTTP_202_ACCEPTED)
+
+
+def progress_summary(topic_id, topic_name, total_vocabulary, stats):
+    """Summary payload shared by the per-topic and all-topics endpoints.
+
+    `stats` holds the user's mastered, learning and tracked (any status)
+    progress row counts for the topic, plus attempts and last_activity.
+    """
+    return {
+        "topic_id": topic_id,
+        "topic_name": topic_name,
+        "total_vocabulary": total_vocabulary,
+        "mastered": stats["mastered"],
+        "learning": stats["learning"],
+        # Words without a progress row
+        "not_started": total_vocabulary - stats["tracked"],
+        "completion_percentage": (
+            (stats["mastered"] / total_vocabulary * 100) if total_vocabulary > 0 else 0
+        ),
+        "total_attempts": stats["attempts"],
+        "last_activity": stats["last_activity"],
+    }
 
-    # Get user's progress for this topic
-    progress_stats = UserProgress.objects.filter(user=user, topic=topic).aggregate(
-        mastered=Count("id", filter=Q(status="mastered")),
-        learning=Count("id", filter=Q(status="learning")),
-        not_started=Count("id", filter=Q(status="not_started")),
-    )
 
-    # Calculate not started count
-    studied_count = (
-        progress_stats["mastered"]
-        + progress_stats["learning"]
-        + progress_stats["not_started"]
+@api_view(["GET"])
+@permission_classes([permissions.IsAuthenticated])
+def topic_progress_summary(request, topic_id):
+    # A single rollup row; the topic is only looked up on its own if the
+    # user has no progress in it yet
+    topic_stats = (
+        UserTopicStats.objects.filter(user=request.user, topic_id=topic_id)
+        .select_related("topic")
+        .first()
     )
-    not_started_count = total_vocabulary - studied_count
+    if topic_stats is not None:
+        topic = topic_stats.topic
+        stats = {
+            "mastered": topic_stats.mastered_count,
+            "learning": topic_stats.learning_count,
+            "tracked": topic_stats.tracked_count,
+            "attempts": topic_stats.total_attempts,
+            "last_activity": topic_stats.last_activity,
+        }
+    else:
+        try:
+            topic = Topic.objects.get(id=topic_id)
+        except Topic.DoesNotExist:
+            return Response(
+                {"error": "Topic not found"}, status=status.HTTP_404_NOT_FOUND
+            )
+        stats = {
+            "mastered": 0,
+            "learning": 0,
+            "tracked": 0,
+            "attempts": 0,
+            "last_activity": None,
+        }
 
     return Response(
-        {
-            "topic_id": topic_id,
-            "topic_name": topic.name,
-            "total_vocabulary": total_vocabulary,
-            "mastered": progress_stats["mastered"],
-            "learning": progress_stats["learning"],
-            "not_started": not_started_count,
-            "completion_percentage": (
-                (progress_stats["mastered"] / total_vocabulary * 100)
-                if total_vocabulary > 0
-                else 0
+        progress_summary(topic_id, topic.name, topic.vocabulary_count, stats)
+    )
+
+
+@api_view(["GET"])
+@permission_classes([permissions.IsAuthenticated])
+def all_topics_progress_summary(request):
+    # One query; the join picks up at most one rollup row per topic
+    topics = (
+        Topic.objects.annotate(
+            stats=FilteredRelation(
+                "usertopicstats", condition=Q(usertopicstats__user=request.user)
+            )
+        )
+        .values(
+            "id",
+            "name",
+            "vocabulary_count",
+            mastered=Coalesce("stats__mastered_count", 0),
+            learning=Coalesce("stats__learning_count", 0),
+            tracked=Coalesce(
+                F("stats__not_started_count")
+                + F("stats__learning_count")
+                + F("stats__mastered_count"),
+                0,
             ),
-        }
+            attempts=Coalesce("stats__total_attempts", 0),
+            last_activity=F("stats__last_activity"),
+        )
+        .order_by("name")
+    )
+
+    return Response(
+        [
+            progress_summary(
+                topic["id"], topic["name"], topic["vocabulary_count"], topic
+            )
+            for topic in topics
+        ]
     )
@@ -0,0 +1,190 @@
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from scipy import sparse
+from django.db import connections, transaction
+from topics.models import Topic
+from vocabulary.models import Vocabulary
+from .models import VocabularyDistractors, DistractorIndexBuild
+
+logger = logging.getLogger(__name__)
+
+# Character n-gram sizes compared between words (padded with spaces, so
+# shared first and last letters count too)
+NGRAM_SIZES = (2, 3)
+
+# Nearest words stored per vocabulary; quizzes pick among them at random
+TOP_K = 10
+
+# Added to the n-gram cosine similarity: closeness in length (0-1, scaled)
+# and a flat bonus for the same difficulty label
+LENGTH_WEIGHT = 0.2
+DIFFICULTY_WEIGHT = 0.1
+
+# Rows scored per dense block; bounds memory at BLOCK_SIZE x topic size
+BLOCK_SIZE = 256
+
+
+def ngram_matrix(words):
+    """Sparse, L2-normalised binary word x n-gram matrix"""
+    columns = {}
+    row_indices = []
+    column_indices = []
+    for row, word in enumerate(words):
+        padded = f" {word.lower()} "
+        grams = {
+            padded[start : start + size]
+            for size in NGRAM_SIZES
+            for start in range(len(padded) - size + 1)
+        }
+        for gram in grams:
+            row_indices.append(row)
+            column_indices.append(columns.setdefault(gram, len(columns)))
+
+    matrix = sparse.csr_matrix(
+        (
+            np.ones(len(row_indices), dtype=np.float32),
+            (row_indices, column_indices),
+        ),
+        shape=(len(words), len(columns)),
+    )
+    norms = np.sqrt(np.asarray(matrix.sum(axis=1)).ravel())
+    return sparse.diags(1 / np.maximum(norms, 1)).astype(np.float32) @ matrix
+
+
+def nearest_words(words, difficulties, top_k=TOP_K):
+    """Yield, per word, the positions of its `top_k` most similar other words.
+
+    Similarity is the cosine of character n-gram vectors plus length and
+    difficulty terms, scored a block of rows at a time with one sparse
+    product. Words equal up to case are never each other's neighbours.
+    """
+    count = len(words)
+    top_k = min(top_k, count - 1)
+    if top_k <= 0:
+        yield from ([] for _ in range(count))
+        return
+
+    matrix = ngram_matrix(words)
+    transposed = matrix.T.tocsr()
+    lengths = np.array([len(word) for word in words], dtype=np.float32)
+    _, levels = np.unique(difficulties, return_inverse=True)
+    _, spellings = np.unique([word.lower() for word in words], return_inverse=True)
+
+    for start in range(0, count, BLOCK_SIZE):
+        stop = min(start + BLOCK_SIZE, count)
+        scores = (matrix[start:stop] @ transposed).toarray()
+        block_lengths = lengths[start:stop, None]
+        scores += LENGTH_WEIGHT * (
+            1
+            - np.abs(block_lengths - lengths)
+            / np.maximum(np.maximum(block_lengths, lengths), 1)
+        )
+        scores += DIFFICULTY_WEIGHT * (levels[start:stop, None] == levels)
+        scores[spellings[start:stop, None] == spellings] = -np.inf
+
+        top = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        for positions, position_scores in zip(top, top_scores):
+            yield positions[np.isfinite(position_scores)].tolist()
+
+
+def topic_fingerprint(rows):
+    """Hash of a topic's (id, word, difficulty) rows; other edits don't count"""
+    digest = hashlib.sha1()
+    for vocabulary_id, word, difficulty in rows:
+        digest.update(f"{vocabulary_id}\t{word}\t{difficulty}\n".encode())
+    return digest.hexdigest()
+
+
+def build_topic_distractors(topic, top_k=TOP_K, force=False, wait=True):
+    """Rebuild a topic's similar-word distractors if its words changed.
+
+    Builds of one topic are serialized with a lock on its row, and whether
+    a build is needed is decided under that lock, so processes racing after
+    a version bump compute it once. Without `wait`, a topic already being
+    built elsewhere is skipped. Topics whose vocabulary version hasn't moved
+    since the last build are skipped without reading their words. Returns
+    True if the topic was rebuilt, False otherwise.
+    """
+    with transaction.atomic():
+        version = (
+            Topic.objects.select_for_update(skip_locked=not wait)
+            .filter(pk=topic.pk)
+            .values_list("vocabulary_version", flat=True)
+            .first()
+        )
+        if version is None:
+            # Deleted, or locked by another build
+            return False
+        build = DistractorIndexBuild.objects.filter(topic=topic).first()
+        if build is not None and build.vocabulary_version == version and not force:
+            return False
+
+        rows = list(
+            Vocabulary.objects.filter(topic=topic)
+            .order_by("id")
+            .values_list("id", "word", "difficulty")
+        )
+        fingerprint = topic_fingerprint(rows)
+        if build is not None and build.fingerprint == fingerprint and not force:
+            # Only fields that don't affect distractors changed
+            build.vocabulary_version = version
+            build.save(update_fields=["vocabulary_version", "built_at"])
+            return False
+
+        words = [word for _, word, _ in rows]
+        difficulties = [difficulty for _, _, difficulty in rows]
+        entries = [
+            VocabularyDistractors(
+                vocabulary_id=vocabulary_id,
+                topic=topic,
+                words=[words[position] for position in positions],
+            )
+            for (vocabulary_id, _, _), positions in zip(
+                rows, nearest_words(words, difficulties, top_k)
+            )
+        ]
+
+        VocabularyDistractors.objects.filter(topic=topic).delete()
+        VocabularyDistractors.objects.bulk_create(entries, batch_size=1000)
+        DistractorIndexBuild.objects.update_or_create(
+            topic=topic,
+            defaults={"fingerprint": fingerprint, "vocabulary_version": version},
+        )
+    return True
+
+
+# One background build at a time; they are CPU heavy
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="distractors")
+_scheduled = set()
+_lock = threading.Lock()
+
+
+def schedule_topic_rebuild(topic_id):
+    """Bring a topic's distractors up to date in the background"""
+    with _lock:
+        if topic_id in _scheduled:
+            return
+        _scheduled.add(topic_id)
+    _executor.submit(_rebuild, topic_id)
+
+
+def _rebuild(topic_id):
+    try:
+        topic = Topic.objects.filter(id=topic_id).first()
+        if topic is not None:
+            # Another process building it already has it covered
+            build_topic_distractors(topic, wait=False)
+    except Exception:
+        logger.exception("Rebuilding distractors for topic %s failed", topic_id)
+    finally:
+        with _lock:
+            _scheduled.discard(topic_id)
+        # Worker threads get their own connections; don't leak them
+        connections.close_all()
@@ -0,0 +1,278 @@
+from random import randint, sample, shuffle
+from django.db import connection
+from django.db.models import Case, F, FilteredRelation, Q, Value, When
+from django.db.models.functions import Ln, Random
+from vocabulary.models import Vocabulary
+from .models import QuizDeck, VocabularyDistractors
+from topics.models import Topic
+from .word_index import get_mixed_index, get_topic_index
+
+# Vocabulary columns a question carries; image and timestamps are never needed
+QUESTION_FIELDS = ("id", "word", "pronunciation", "meaning", "example", "difficulty")
+
+# Wrong options per question
+DISTRACTOR_COUNT = 3
+
+# Largest quiz generate_quiz builds; longer requests are cut down to it
+MAX_QUESTION_COUNT = 100
+
+# How generate_quiz picks words: uniformly, weighted by the user's progress,
+# dealt from the user's shuffled deck for the topic, as a fixed mix of
+# difficulty levels, or uniformly across every topic the user has studied
+QUIZ_MODES = ("random", "adaptive", "deck", "stratified", "mixed")
+
+# Adaptive selection weights. Learning words range from LEARNING_WEIGHT at
+# 100% accuracy to LEARNING_WEIGHT + WEAKNESS_WEIGHT at 0%.
+UNSEEN_WEIGHT = 3.0
+LEARNING_WEIGHT = 1.0
+WEAKNESS_WEIGHT = 4.0
+MASTERED_WEIGHT = 0.25
+
+DIFFICULTY_LEVELS = [level for level, _ in Vocabulary.DIFFICULTY_CHOICES]
+
+# Stratified sampling: each round probes PROBE_FACTOR random ids per word
+# wanted; tiny buckets that keep colliding are read in full instead
+PROBE_FACTOR = 2
+PROBE_ROUNDS = 3
+
+
+def build_question(number, vocab, distractors):
+    """Build a single multiple choice question for a vocabulary row"""
+    options = [vocab.word] + distractors
+    shuffle(options)
+
+    return {
+        "id": f"q{number}",
+        "vocabulary": {
+            "id": vocab.id,
+            "word": vocab.word,
+            "pronunciation": vocab.pronunciation,
+            "meaning": vocab.meaning,
+            "example": vocab.example,
+            "difficulty": vocab.difficulty,
+        },
+        "options": options,
+        "correct_answer": vocab.word,
+    }
+
+
+def build_questions(topic, question_count):
+    """Generate up to `question_count` random questions for a topic"""
+    index = get_topic_index(topic)
+    question_count = min(question_count, len(index))
+    if question_count <= 0:
+        return []
+
+    return build_questions_at(index, index.sample_positions(question_count))
+
+
+def build_questions_at(index, positions):
+    """Build questions for the words at the given positions of a word index"""
+    return build_located_questions([(index, position) for position in positions])
+
+
+def build_located_questions(located):
+    """Build questions for (TopicWordIndex, position) pairs.
+
+    Distractors are picked among the word's precomputed similar words that
+    are still in the topic, or drawn at random from the same topic index if
+    there aren't enough.
+    """
+    vocabulary_ids = [index.ids[position] for index, position in located]
+    # Only the selected rows are loaded in full
+    vocabularies = Vocabulary.objects.only(*QUESTION_FIELDS).in_bulk(vocabulary_ids)
+    similar_words = dict(
+        VocabularyDistractors.objects.filter(
+            vocabulary_id__in=vocabulary_ids
+        ).values_list("vocabulary_id", "words")
+    )
+
+    questions = []
+    for index, position in located:
+        vocab = vocabularies.get(index.ids[position])
+        if vocab is None:
+            # Deleted after the index was built
+            continue
+        # Stored words may have been renamed or deleted since the last build
+        candidates = [
+            word
+            for word in similar_words.get(vocab.id, ())
+            if word != vocab.word and index.has_word(word)
+        ]
+        if len(candidates) >= DISTRACTOR_COUNT:
+            distractors = sample(candidates, DISTRACTOR_COUNT)
+        else:
+            distractors = index.sample_distractors(position, DISTRACTOR_COUNT)
+        questions.append(build_question(len(questions) + 1, vocab, distractors))
+
+    return questions
+
+
+def build_adaptive_questions(topic, user, question_count):
+    """Generate up to `question_count` questions favouring the user's weak words.
+
+    Words are drawn without replacement with probability proportional to a
+    weight computed from the user's progress (Efraimidis-Spirakis: the rows
+    with the largest ln(u) / weight win). Weighting, sampling and the LIMIT
+    all run in one query over the topic joined to the user's progress.
+    """
+    weight = Case(
+        When(progress__status="mastered", then=Value(MASTERED_WEIGHT)),
+        When(
+            progress__status="learning",
+            then=Value(LEARNING_WEIGHT)
+            + Value(WEAKNESS_WEIGHT) * (100 - F("progress__accuracy")) / 100,
+        ),
+        default=Value(UNSEEN_WEIGHT),
+    )
+    vocabularies = list(
+        Vocabulary.objects.filter(topic_id=topic.id)
+        .annotate(
+            progress=FilteredRelation(
+                "userprogress", condition=Q(userprogress__user=user)
+            ),
+            sample_key=Ln(1 - Random()) / weight,
+        )
+        .only(*QUESTION_FIELDS)
+        .order_by("-sample_key")[:question_count]
+    )
+
+    index = get_topic_index(topic)
+    questions = []
+    for vocab in vocabularies:
+        position = index.position_of(vocab.id)
+        if position is None:
+            # Added after the index was built
+            continue
+        distractors = index.sample_distractors(position)
+        questions.append(build_question(len(questions) + 1, vocab, distractors))
+
+    return questions
+
+
+def build_deck_questions(topic, user, question_count):
+    """Generate up to `question_count` questions dealt from the user's deck.
+
+    No word repeats until every word in the topic has been asked.
+    """
+    index = get_topic_index(topic)
+    vocabulary_ids = QuizDeck.draw(user, topic, index, question_count)
+    positions = [index.position_of(vocabulary_id) for vocabulary_id in vocabulary_ids]
+    return build_questions_at(
+        index, [position for position in positions if position is not None]
+    )
+
+
+def default_difficulty_mix(question_count):
+    """Split a question count as evenly as possible across difficulty levels"""
+    share, remainder = divmod(question_count, len(DIFFICULTY_LEVELS))
+    return {
+        level: share + (position < remainder)
+        for position, level in enumerate(DIFFICULTY_LEVELS)
+    }
+
+
+def parse_difficulty_mix(value):
+    """Validate a {level: count} mix from a request; raises ValueError"""
+    if not isinstance(value, dict) or not set(value) <= set(DIFFICULTY_LEVELS):
+        raise ValueError(f"Mix keys must be among: {', '.join(DIFFICULTY_LEVELS)}")
+    mix = {level: int(count) for level, count in value.items()}
+    if any(count < 0 for count in mix.values()) or not sum(mix.values()):
+        raise ValueError("Mix counts must be non-negative and not all zero")
+    if sum(mix.values()) > MAX_QUESTION_COUNT:
+        raise ValueError(f"Mix counts must add up to at most {MAX_QUESTION_COUNT}")
+    return mix
+
+
+def sample_difficulty_bucket(topic_id, difficulty, count):
+    """Pick up to `count` distinct random ids of one difficulty in a topic.
+
+    Each probe is a random id between the bucket's smallest and largest id,
+    resolved to the next existing id with an index seek on (topic,
+    difficulty, id), so the cost doesn't grow with the topic. Ids after a
+    gap are somewhat more likely to be picked.
+    """
+    table = Vocabulary._meta.db_table
+    bounds_sql = f"""
+        SELECT min(id), max(id) FROM {table}
+        WHERE topic_id = %s AND difficulty = %s
+    """
+    probe_sql = f"""
+        SELECT DISTINCT v.id
+        FROM unnest(%s::bigint[]) AS r (start)
+        CROSS JOIN LATERAL (
+            SELECT id FROM {table}
+            WHERE topic_id = %s AND difficulty = %s AND id >= r.start
+            ORDER BY id
+            LIMIT 1
+        ) AS v
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(bounds_sql, [topic_id, difficulty])
+        low, high = cursor.fetchone()
+        if low is None or count <= 0:
+            return []
+        # The bucket can't hold more ids than its id range
+        count = min(count, high - low + 1)
+
+        picked = set()
+        for _ in range(PROBE_ROUNDS):
+            starts = [
+                randint(low, high) for _ in range((count - len(picked)) * PROBE_FACTOR)
+            ]
+            cursor.execute(probe_sql, [starts, topic_id, difficulty])
+            picked.update(vocabulary_id for vocabulary_id, in cursor.fetchall())
+            if len(picked) >= count:
+                return sample(sorted(picked), count)
+
+    # Still short: the bucket is about as small as the request
+    ids = list(
+        Vocabulary.objects.filter(topic_id=topic_id, difficulty=difficulty)
+        .order_by()
+        .values_list("id", flat=True)[: count * PROBE_FACTOR * PROBE_ROUNDS]
+    )
+    return sample(ids, min(count, len(ids)))
+
+
+def build_stratified_questions(topic, mix):
+    """Generate questions with `mix[level]` words of each difficulty level"""
+    index = get_topic_index(topic)
+    vocabulary_ids = []
+    for level, count in mix.items():
+        vocabulary_ids.extend(sample_difficulty_bucket(topic.id, level, count))
+    shuffle(vocabulary_ids)
+
+    positions = [index.position_of(vocabulary_id) for vocabulary_id in vocabulary_ids]
+    return build_questions_at(
+        index, [position for position in positions if position is not None]
+    )
+
+
+def build_mixed_questions(user, question_count, topic_ids=None):
+    """Generate up to `question_count` random questions across topics.
+
+    Draws uniformly from every topic the user has progress in, or from
+    `topic_ids` among them, using the per-topic word indexes. Each question
+    carries its topic_id.
+    """
+    topics = Topic.objects.filter(usertopicstats__user=user).only(
+        "id", "vocabulary_version"
+    )
+    if topic_ids is not None:
+        topics = topics.filter(id__in=topic_ids)
+
+    index = get_mixed_index(topics)
+    question_count = min(question_count, len(index))
+    if question_count <= 0:
+        return []
+
+    positions = index.sample_positions(question_count)
+    located = [index.locate(position) for position in positions]
+    questions = build_located_questions(located)
+    topic_by_word = {
+        topic_index.ids[position]: topic_index.topic_id
+        for topic_index, position in located
+    }
+    for question in questions:
+        question["topic_id"] = topic_by_word[question["vocabulary"]["id"]]
+    return questions
@@ -0,0 +1,61 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from quizzes.models import QuizSession, ArchivedQuizSession
+
+
+class Command(BaseCommand):
+    help = (
+        "Move old quiz sessions into compressed cold storage. Each batch is "
+        "committed on its own, so an interrupted run can simply be restarted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than-days",
+            type=int,
+            default=settings.QUIZ_ARCHIVE_AFTER_DAYS,
+            help="Archive sessions completed more than this many days ago",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--max-batches", type=int, help="Stop after this many batches"
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["older_than_days"])
+        batch_size = options["batch_size"]
+        max_batches = options["max_batches"]
+
+        archived = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            moved = self.archive_batch(cutoff, batch_size)
+            if not moved:
+                break
+            archived += moved
+            batches += 1
+            self.stdout.write(f"Archived {archived} sessions...")
+
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} quiz sessions"))
+
+    def archive_batch(self, cutoff, batch_size):
+        with transaction.atomic():
+            sessions = list(
+                QuizSession.objects.filter(completed_at__lt=cutoff)
+                .order_by("id")
+                .select_for_update(skip_locked=True)[:batch_size]
+            )
+            if not sessions:
+                return 0
+
+            ArchivedQuizSession.objects.bulk_create(
+                [ArchivedQuizSession.from_session(session) for session in sessions],
+                ignore_conflicts=True,
+            )
+            # Deleting detaches the sessions' QuizAnswer rows; per-user stats
+            # are running totals and are left untouched
+            QuizSession.objects.filter(id__in=[s.id for s in sessions]).delete()
+            return len(sessions)
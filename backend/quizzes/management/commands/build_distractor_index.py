@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from topics.models import Topic
+from quizzes.distractors import TOP_K, build_topic_distractors
+
+
+class Command(BaseCommand):
+    help = (
+        "Precompute similar-word distractors for quiz questions. Only topics "
+        "whose words changed since the last build are rebuilt."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--topic", type=int, help="Only build this topic id")
+        parser.add_argument("--top-k", type=int, default=TOP_K)
+        parser.add_argument(
+            "--force", action="store_true", help="Rebuild unchanged topics too"
+        )
+
+    def handle(self, *args, **options):
+        topics = Topic.objects.order_by("id")
+        if options["topic"] is not None:
+            topics = topics.filter(id=options["topic"])
+
+        rebuilt = 0
+        for topic in topics:
+            if build_topic_distractors(topic, options["top_k"], options["force"]):
+                rebuilt += 1
+                self.stdout.write(f"Rebuilt distractors for {topic.name}")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt distractors for {rebuilt} topics")
+        )
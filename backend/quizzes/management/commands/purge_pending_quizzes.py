@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from quizzes.models import PendingQuiz
+
+
+class Command(BaseCommand):
+    help = "Delete generated quizzes that expired without being submitted"
+
+    def handle(self, *args, **options):
+        deleted, _ = PendingQuiz.objects.filter(expires_at__lte=timezone.now()).delete()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired quizzes"))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from accounts.models import User
+from quizzes.models import UserQuizStats
+
+
+class Command(BaseCommand):
+    help = "Rebuild per-user quiz statistics from quiz sessions"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        user_ids = User.objects.order_by("id").values_list("id", flat=True)
+
+        rebuilt = 0
+        batch = []
+        for user_id in user_ids.iterator():
+            batch.append(user_id)
+            if len(batch) >= batch_size:
+                rebuilt += UserQuizStats.rebuild(batch)
+                batch = []
+        if batch:
+            rebuilt += UserQuizStats.rebuild(batch)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt quiz stats for {rebuilt} users")
+        )
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.2 on 2026-10-17 10:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_correct_count(apps, schema_editor):
+    QuizSession = apps.get_model("quizzes", "QuizSession")
+    batch = []
+    for session in QuizSession.objects.only("id", "questions_data").iterator():
+        session.correct_count = sum(
+            1 for q in session.questions_data if q.get("is_correct", False)
+        )
+        batch.append(session)
+        if len(batch) >= 1000:
+            QuizSession.objects.bulk_update(batch, ["correct_count"])
+            batch = []
+    if batch:
+        QuizSession.objects.bulk_update(batch, ["correct_count"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0002_pendingquiz'),
+        ('vocabulary', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizsession',
+            name='correct_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_correct_count, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='QuizAnswer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_correct', models.BooleanField()),
+                ('chosen_option', models.SmallIntegerField(blank=True, null=True)),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='answers', to='quizzes.quizsession')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                ('vocabulary', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='vocabulary.vocabulary')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'vocabulary'], name='quizanswer_user_vocab_idx'), models.Index(fields=['user', 'is_correct'], name='quizanswer_user_correct_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.2 on 2026-10-17 11:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0003_quizsession_correct_count_quizanswer'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='quizsession',
+            index=models.Index(fields=['user', '-completed_at'], name='quizsession_user_recent_idx'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.2 on 2026-10-17 11:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_user_quiz_stats(apps, schema_editor):
+    QuizSession = apps.get_model("quizzes", "QuizSession")
+    UserQuizStats = apps.get_model("quizzes", "UserQuizStats")
+    sessions = QuizSession.objects.order_by()
+
+    topics = {}
+    for user_id, topic_id in sessions.values_list("user", "topic").distinct():
+        topics.setdefault(user_id, []).append(topic_id)
+
+    UserQuizStats.objects.bulk_create(
+        [
+            UserQuizStats(
+                user_id=row["user"],
+                total_quizzes=row["total_quizzes"],
+                score_sum=row["score_sum"],
+                best_score=row["best_score"],
+                total_time_spent=row["total_time_spent"],
+                topic_ids=sorted(topics[row["user"]]),
+            )
+            for row in sessions.values("user").annotate(
+                total_quizzes=models.Count("id"),
+                score_sum=models.Sum("score"),
+                best_score=models.Max("score"),
+                total_time_spent=models.Sum("time_spent"),
+            )
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0004_quizsession_quizsession_user_recent_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserQuizStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='quiz_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total_quizzes', models.IntegerField(default=0)),
+                ('score_sum', models.BigIntegerField(default=0)),
+                ('best_score', models.IntegerField(default=0)),
+                ('total_time_spent', models.BigIntegerField(default=0)),
+                ('topic_ids', models.JSONField(default=list)),
+            ],
+        ),
+        migrations.RunPython(backfill_user_quiz_stats, migrations.RunPython.noop),
+    ]
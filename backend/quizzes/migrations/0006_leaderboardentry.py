@@ -0,0 +1,61 @@
+# Generated by Django 5.2.2 on 2026-10-17 12:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_leaderboards(apps, schema_editor):
+    QuizSession = apps.get_model("quizzes", "QuizSession")
+    LeaderboardEntry = apps.get_model("quizzes", "LeaderboardEntry")
+    sessions = QuizSession.objects.order_by()
+
+    for group_by in (("user", "topic"), ("user",)):
+        LeaderboardEntry.objects.bulk_create(
+            [
+                LeaderboardEntry(
+                    user_id=row["user"],
+                    topic_id=row.get("topic"),
+                    quiz_count=row["quiz_count"],
+                    score_sum=row["score_sum"],
+                    best_score=row["best_score"],
+                    average_score=row["score_sum"] / row["quiz_count"],
+                )
+                for row in sessions.values(*group_by).annotate(
+                    quiz_count=models.Count("id"),
+                    score_sum=models.Sum("score"),
+                    best_score=models.Max("score"),
+                )
+            ],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0005_userquizstats'),
+        ('topics', '0002_topic_vocabulary_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quiz_count', models.IntegerField(default=0)),
+                ('score_sum', models.BigIntegerField(default=0)),
+                ('best_score', models.IntegerField(default=0)),
+                ('average_score', models.FloatField(default=0.0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('topic', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='topics.topic')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['topic', '-average_score', 'user'], name='leaderboard_average_idx'), models.Index(fields=['topic', '-best_score', 'user'], name='leaderboard_best_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('topic__isnull', False)), fields=('user', 'topic'), name='leaderboard_unique_user_topic'), models.UniqueConstraint(condition=models.Q(('topic__isnull', True)), fields=('user',), name='leaderboard_unique_user_global')],
+            },
+        ),
+        migrations.RunPython(backfill_leaderboards, migrations.RunPython.noop),
+    ]
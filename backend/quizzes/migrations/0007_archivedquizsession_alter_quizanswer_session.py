@@ -0,0 +1,42 @@
+# Generated by Django 5.2.2 on 2026-10-17 12:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0006_leaderboardentry'),
+        ('topics', '0002_topic_vocabulary_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedQuizSession',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('questions_blob', models.BinaryField()),
+                ('score', models.IntegerField()),
+                ('total_questions', models.IntegerField()),
+                ('correct_count', models.IntegerField(default=0)),
+                ('time_spent', models.IntegerField()),
+                ('accuracy', models.FloatField()),
+                ('completed_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('topic', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='topics.topic')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-completed_at'],
+                'indexes': [models.Index(fields=['user', '-completed_at'], name='archivedquiz_user_recent_idx')],
+            },
+        ),
+        migrations.AlterField(
+            model_name='quizanswer',
+            name='session',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='answers', to='quizzes.quizsession'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.2 on 2026-10-17 17:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0008_quizdeck'),
+        ('topics', '0002_topic_vocabulary_version'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='pendingquiz',
+            name='topic',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='topics.topic'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.2 on 2026-10-17 18:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0009_alter_pendingquiz_topic'),
+        ('topics', '0002_topic_vocabulary_version'),
+        ('vocabulary', '0003_vocabulary_vocab_topic_difficulty_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DistractorIndexBuild',
+            fields=[
+                ('topic', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to='topics.topic')),
+                ('fingerprint', models.CharField(max_length=40)),
+                ('built_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='VocabularyDistractors',
+            fields=[
+                ('vocabulary', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='similar_words', serialize=False, to='vocabulary.vocabulary')),
+                ('words', models.JSONField(default=list)),
+                ('topic', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='topics.topic')),
+            ],
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.2 on 2026-10-17 20:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models.functions import Floor
+
+BUCKET_SCALES = {"average_score": 10, "best_score": 1}
+
+
+def backfill_buckets(apps, schema_editor):
+    LeaderboardEntry = apps.get_model("quizzes", "LeaderboardEntry")
+    LeaderboardBucket = apps.get_model("quizzes", "LeaderboardBucket")
+
+    for metric, scale in BUCKET_SCALES.items():
+        rows = (
+            LeaderboardEntry.objects.order_by()
+            .annotate(bucket=Floor(models.F(metric) * scale))
+            .values("topic", "bucket")
+            .annotate(entry_count=models.Count("id"))
+        )
+        LeaderboardBucket.objects.bulk_create(
+            [
+                LeaderboardBucket(
+                    topic_id=row["topic"],
+                    metric=metric,
+                    bucket=row["bucket"],
+                    entry_count=row["entry_count"],
+                )
+                for row in rows
+            ],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0010_vocabularydistractors_distractorindexbuild'),
+        ('topics', '0002_topic_vocabulary_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(condition=models.Q(('topic__isnull', True)), fields=['-average_score', 'user'], name='leaderboard_global_average_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(condition=models.Q(('topic__isnull', True)), fields=['-best_score', 'user'], name='leaderboard_global_best_idx'),
+        ),
+        migrations.CreateModel(
+            name='LeaderboardBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(max_length=20)),
+                ('bucket', models.IntegerField()),
+                ('entry_count', models.IntegerField(default=0)),
+                ('topic', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='topics.topic')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(condition=models.Q(('topic__isnull', False)), fields=('topic', 'metric', 'bucket'), name='leaderboardbucket_unique_topic'), models.UniqueConstraint(condition=models.Q(('topic__isnull', True)), fields=('metric', 'bucket'), name='leaderboardbucket_unique_global')],
+            },
+        ),
+        migrations.RunPython(backfill_buckets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.2 on 2026-10-17 22:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0012_quizanswer_created_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='distractorindexbuild',
+            name='vocabulary_version',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
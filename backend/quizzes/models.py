@@ -1,8 +1,15 @@
-from django.db import models
+from django.db import models, transaction, IntegrityError
+from django.db.models import F, Sum
+from django.db.models.functions import Floor, Substr
 from django.conf import settings
 from topics.models import Topic
 from vocabulary.models import Vocabulary
+from array import array
+from random import shuffle
 import json
+import math
+import uuid
+import zlib
 
 
 class QuizSession(models.Model):
@@ -11,25 +18,586 @@ class QuizSession(models.Model):
     questions_data = models.JSONField()  # Store questions and answers
     score = models.IntegerField()
     total_questions = models.IntegerField()
+    correct_count = models.IntegerField(default=0)
     time_spent = models.IntegerField()  # in seconds
     accuracy = models.FloatField()
     completed_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ["-completed_at"]
+        indexes = [
+            models.Index(
+                fields=["user", "-completed_at"], name="quizsession_user_recent_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.name} - {self.topic.name} Quiz ({self.score}%)"
 
     @property
     def correct_answers(self):
-        return sum(1 for q in self.questions_data if q.get("is_correct", False))
+        return self.correct_count
 
     @property
     def incorrect_answers(self):
         return self.total_questions - self.correct_answers
 
     def save(self, *args, **kwargs):
+        adding = self._state.adding
         super().save(*args, **kwargs)
         # Update user's learning statistics
-        self.user.update_learning_stats()
+        if adding:
+            self.user.apply_learning_stats_delta(quizzes=1, score=self.score)
+            UserQuizStats.record_session(self)
+            LeaderboardEntry.record_session(self)
+        else:
+            # An edited score can't be applied as a delta, recount instead
+            self.user.update_learning_stats()
+
+
+class ArchivedQuizSession(models.Model):
+    """A quiz session moved to cold storage with its questions compressed.
+
+    Keeps the original QuizSession id so old links keep resolving.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    topic = models.ForeignKey(Topic, on_delete=models.CASCADE)
+    questions_blob = models.BinaryField()  # zlib-compressed questions_data JSON
+    score = models.IntegerField()
+    total_questions = models.IntegerField()
+    correct_count = models.IntegerField(default=0)
+    time_spent = models.IntegerField()
+    accuracy = models.FloatField()
+    completed_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-completed_at"]
+        indexes = [
+            models.Index(
+                fields=["user", "-completed_at"], name="archivedquiz_user_recent_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user.name} - {self.topic.name} Quiz ({self.score}%, archived)"
+
+    @classmethod
+    def from_session(cls, session):
+        questions = json.dumps(session.questions_data, separators=(",", ":"))
+        return cls(
+            id=session.id,
+            user_id=session.user_id,
+            topic_id=session.topic_id,
+            questions_blob=zlib.compress(questions.encode()),
+            score=session.score,
+            total_questions=session.total_questions,
+            correct_count=session.correct_count,
+            time_spent=session.time_spent,
+            accuracy=session.accuracy,
+            completed_at=session.completed_at,
+        )
+
+    def hydrate(self):
+        """Rebuild an unsaved QuizSession for serialization"""
+        return QuizSession(
+            id=self.id,
+            user_id=self.user_id,
+            topic=self.topic,
+            questions_data=json.loads(zlib.decompress(bytes(self.questions_blob))),
+            score=self.score,
+            total_questions=self.total_questions,
+            correct_count=self.correct_count,
+            time_spent=self.time_spent,
+            accuracy=self.accuracy,
+            completed_at=self.completed_at,
+        )
+
+
+class UserQuizStats(models.Model):
+    """Running quiz statistics of a user, so quiz_stats reads a single row"""
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="quiz_stats",
+    )
+    total_quizzes = models.IntegerField(default=0)
+    score_sum = models.BigIntegerField(default=0)
+    best_score = models.IntegerField(default=0)
+    total_time_spent = models.BigIntegerField(default=0)  # in seconds
+    topic_ids = models.JSONField(default=list)  # topics the user took quizzes on
+
+    def __str__(self):
+        return f"{self.user.name} - {self.total_quizzes} quizzes"
+
+    @property
+    def average_score(self):
+        if self.total_quizzes == 0:
+            return 0
+        return self.score_sum / self.total_quizzes
+
+    @classmethod
+    def record_session(cls, session):
+        """Add a newly completed quiz session to the user's running stats"""
+        with transaction.atomic():
+            stats, created = cls.objects.select_for_update().get_or_create(
+                user_id=session.user_id
+            )
+            stats.total_quizzes += 1
+            stats.score_sum += session.score
+            stats.best_score = max(stats.best_score, session.score)
+            stats.total_time_spent += session.time_spent
+            if session.topic_id not in stats.topic_ids:
+                stats.topic_ids.append(session.topic_id)
+            stats.save()
+
+    @classmethod
+    def rebuild(cls, user_ids):
+        """Recompute the given users' stats from their quiz sessions.
+
+        Returns the number of users who have taken at least one quiz.
+        """
+        totals = {}
+        topics = {}
+        # Archived sessions still count towards the stats
+        for model in (QuizSession, ArchivedQuizSession):
+            sessions = model.objects.filter(user_id__in=user_ids).order_by()
+            for user_id, topic_id in sessions.values_list("user", "topic").distinct():
+                topics.setdefault(user_id, set()).add(topic_id)
+            for row in sessions.values("user").annotate(
+                total_quizzes=models.Count("id"),
+                score_sum=models.Sum("score"),
+                best_score=models.Max("score"),
+                total_time_spent=models.Sum("time_spent"),
+            ):
+                total = totals.setdefault(
+                    row["user"], cls(user_id=row["user"], topic_ids=[])
+                )
+                total.total_quizzes += row["total_quizzes"]
+                total.score_sum += row["score_sum"]
+                total.best_score = max(total.best_score, row["best_score"])
+                total.total_time_spent += row["total_time_spent"]
+
+        rows = list(totals.values())
+        for row in rows:
+            row.topic_ids = sorted(topics[row.user_id])
+
+        with transaction.atomic():
+            cls.objects.filter(user_id__in=user_ids).exclude(
+                user_id__in=topics
+            ).delete()
+            cls.objects.bulk_create(
+                rows,
+                batch_size=1000,
+                update_conflicts=True,
+                unique_fields=["user"],
+                update_fields=[
+                    "total_quizzes",
+                    "score_sum",
+                    "best_score",
+                    "total_time_spent",
+                    "topic_ids",
+                ],
+            )
+        return len(rows)
+
+
+class LeaderboardEntry(models.Model):
+    """A user's standing on a topic leaderboard, or the global one (no topic)"""
+
+    METRICS = ("average_score", "best_score")
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    topic = models.ForeignKey(Topic, on_delete=models.CASCADE, null=True, blank=True)
+    quiz_count = models.IntegerField(default=0)
+    score_sum = models.BigIntegerField(default=0)
+    best_score = models.IntegerField(default=0)
+    average_score = models.FloatField(default=0.0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "topic"],
+                condition=models.Q(topic__isnull=False),
+                name="leaderboard_unique_user_topic",
+            ),
+            models.UniqueConstraint(
+                fields=["user"],
+                condition=models.Q(topic__isnull=True),
+                name="leaderboard_unique_user_global",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["topic", "-average_score", "user"],
+                name="leaderboard_average_idx",
+            ),
+            models.Index(
+                fields=["topic", "-best_score", "user"], name="leaderboard_best_idx"
+            ),
+            # The global board is by far the largest; give it indexes of its own
+            models.Index(
+                fields=["-average_score", "user"],
+                condition=models.Q(topic__isnull=True),
+                name="leaderboard_global_average_idx",
+            ),
+            models.Index(
+                fields=["-best_score", "user"],
+                condition=models.Q(topic__isnull=True),
+                name="leaderboard_global_best_idx",
+            ),
+        ]
+
+    def __str__(self):
+        scope = self.topic.name if self.topic_id else "Global"
+        return f"{self.user.name} - {scope} ({self.average_score:.1f})"
+
+    def buckets(self):
+        """The (topic, metric, bucket) keys this entry is counted under"""
+        return [
+            (self.topic_id, metric, LeaderboardBucket.bucket_of(metric, self))
+            for metric in self.METRICS
+        ]
+
+    @classmethod
+    def record_session(cls, session):
+        """Fold a newly completed session into its topic and global entries"""
+        deltas = {}
+        with transaction.atomic():
+            for topic_id in (session.topic_id, None):
+                entry, created = cls.objects.select_for_update().get_or_create(
+                    user_id=session.user_id, topic_id=topic_id
+                )
+                if not created:
+                    for key in entry.buckets():
+                        deltas[key] = deltas.get(key, 0) - 1
+                entry.quiz_count += 1
+                entry.score_sum += session.score
+                entry.best_score = max(entry.best_score, session.score)
+                entry.average_score = entry.score_sum / entry.quiz_count
+                entry.save()
+                for key in entry.buckets():
+                    deltas[key] = deltas.get(key, 0) + 1
+            # Global buckets are shared by every user; updating them inside
+            # this transaction would serialize unrelated submissions
+            transaction.on_commit(
+                lambda: LeaderboardBucket.apply_deltas(deltas), robust=True
+            )
+
+    @classmethod
+    def top(cls, topic_id, metric, limit):
+        """The `limit` best entries of a leaderboard, read off its index"""
+        return (
+            cls.objects.filter(topic_id=topic_id)
+            .select_related("user")
+            .order_by(f"-{metric}", "user_id")[:limit]
+        )
+
+    def rank(self, metric):
+        """1-based competition rank on this entry's leaderboard.
+
+        Entries in higher score buckets are summed from LeaderboardBucket;
+        only this entry's own bucket is counted row by row.
+        """
+        score = getattr(self, metric)
+        bucket = LeaderboardBucket.bucket_of(metric, self)
+        ahead = LeaderboardBucket.objects.filter(
+            topic_id=self.topic_id, metric=metric, bucket__gt=bucket
+        ).aggregate(total=Sum("entry_count"))["total"]
+
+        # The range keeps the scan on the index; the bucket test makes the
+        # boundary agree exactly with how buckets were assigned
+        scale = LeaderboardBucket.SCALES[metric]
+        same_bucket = (
+            type(self)
+            .objects.filter(
+                topic_id=self.topic_id,
+                **{
+                    f"{metric}__gt": score,
+                    f"{metric}__lt": (bucket + 2) / scale,
+                },
+            )
+            .annotate(bucket=Floor(F(metric) * scale))
+            .filter(bucket=bucket)
+        )
+        return (ahead or 0) + same_bucket.count() + 1
+
+
+class LeaderboardBucket(models.Model):
+    """How many entries of a leaderboard fall in one score bucket.
+
+    Buckets are floor(score * scale) for each metric, so ranking an entry
+    sums at most a thousand bucket rows instead of counting every entry
+    ahead of it.
+    """
+
+    # Average scores go to 0.1 points; best scores are whole numbers
+    SCALES = {"average_score": 10, "best_score": 1}
+
+    topic = models.ForeignKey(Topic, on_delete=models.CASCADE, null=True, blank=True)
+    metric = models.CharField(max_length=20)
+    bucket = models.IntegerField()
+    entry_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["topic", "metric", "bucket"],
+                condition=models.Q(topic__isnull=False),
+                name="leaderboardbucket_unique_topic",
+            ),
+            models.UniqueConstraint(
+                fields=["metric", "bucket"],
+                condition=models.Q(topic__isnull=True),
+                name="leaderboardbucket_unique_global",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.metric} {self.bucket}: {self.entry_count}"
+
+    @classmethod
+    def bucket_of(cls, metric, entry):
+        return math.floor(getattr(entry, metric) * cls.SCALES[metric])
+
+    @classmethod
+    def apply_deltas(cls, deltas):
+        """Add {(topic_id, metric, bucket): delta} to the bucket counts.
+
+        Applied in a fixed order so concurrent sessions can't deadlock. Run
+        after the entries' transaction commits, so ranks can briefly lag.
+        Negative deltas never create rows, so they are safe to apply while
+        a topic is being deleted.
+        """
+        for (topic_id, metric, bucket), delta in sorted(
+            deltas.items(), key=lambda item: (item[0][0] or 0, *item[0][1:])
+        ):
+            if not delta:
+                continue
+            buckets = cls.objects.filter(
+                topic_id=topic_id, metric=metric, bucket=bucket
+            )
+            if buckets.update(entry_count=F("entry_count") + delta) or delta < 0:
+                continue
+            try:
+                with transaction.atomic():
+                    cls.objects.create(
+                        topic_id=topic_id,
+                        metric=metric,
+                        bucket=bucket,
+                        entry_count=delta,
+                    )
+            except IntegrityError:
+                # A concurrent session created the bucket meanwhile
+                buckets.update(entry_count=F("entry_count") + delta)
+
+
+class QuizAnswer(models.Model):
+    """One answered question of a quiz session, for per-word answer queries"""
+
+    # Cleared when the session is archived; the answer itself is kept
+    session = models.ForeignKey(
+        QuizSession,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="answers",
+    )
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    vocabulary = models.ForeignKey(Vocabulary, on_delete=models.CASCADE)
+    is_correct = models.BooleanField()
+    # Index into the question's options, None if unanswered
+    chosen_option = models.SmallIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "vocabulary"], name="quizanswer_user_vocab_idx"
+            ),
+            models.Index(
+                fields=["user", "is_correct"], name="quizanswer_user_correct_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user.name} - {self.vocabulary.word} ({self.is_correct})"
+
+
+class PendingQuiz(models.Model):
+    """A generated quiz held server-side until the user submits answers"""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    # None for mixed quizzes drawing from several topics
+    topic = models.ForeignKey(Topic, on_delete=models.CASCADE, null=True, blank=True)
+    questions = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        topic = self.topic.name if self.topic else "Mixed"
+        return f"{self.user.name} - {topic} Quiz ({self.id})"
+
+    def grade(self, answers):
+        """Return the questions with the chosen option and correctness filled in.
+
+        `answers` holds one option index per question, or None if unanswered.
+        """
+        graded = []
+        for question, answer in zip(self.questions, answers):
+            options = question["options"]
+            user_answer = (
+                options[answer] if answer is not None and answer < len(options) else ""
+            )
+            graded.append(
+                {
+                    **question,
+                    "user_answer": user_answer,
+                    "is_correct": user_answer == question["correct_answer"],
+                }
+            )
+        return graded
+
+
+class QuizDeck(models.Model):
+    """A user's shuffled pass through a topic, so quizzes don't repeat words.
+
+    The deck is a random permutation of the topic's vocabulary ids, stored as
+    packed 64-bit integers, and a cursor into it. It is reshuffled once
+    exhausted or when the topic's vocabulary version moves on.
+    """
+
+    ID_SIZE = array("q").itemsize
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    topic = models.ForeignKey(Topic, on_delete=models.CASCADE)
+    vocabulary_ids = models.BinaryField()
+    cursor = models.IntegerField(default=0)
+    topic_version = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "topic"], name="quizdeck_unique_user_topic"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.topic_id} deck at {self.cursor}"
+
+    @property
+    def size(self):
+        return len(self.vocabulary_ids) // self.ID_SIZE
+
+    def shuffle(self, index):
+        """Start a new pass over the words of a TopicWordIndex"""
+        ids = array("q", index.ids)
+        shuffle(ids)
+        self.vocabulary_ids = ids.tobytes()
+        self.cursor = 0
+        self.topic_version = index.version
+
+    def take(self, count):
+        """Return the next `count` ids (fewer at the end) and advance"""
+        ids = array("q")
+        ids.frombytes(
+            self.vocabulary_ids[
+                self.cursor * self.ID_SIZE : (self.cursor + count) * self.ID_SIZE
+            ]
+        )
+        self.cursor += len(ids)
+        return ids.tolist()
+
+    @classmethod
+    def draw(cls, user, topic, index, count):
+        """Take up to `count` vocabulary ids from the user's deck for a topic.
+
+        `index` is the topic's current TopicWordIndex. Usually only the next
+        `count` ids are read, sliced out in SQL, and only the cursor is
+        written back; the whole deck is rewritten only when it is reshuffled.
+        When the deck runs out part-way, the rest comes from a fresh shuffle,
+        skipping words already drawn for this quiz.
+        """
+        count = min(count, len(index))
+        if count <= 0:
+            return []
+
+        with transaction.atomic():
+            deck = (
+                cls.objects.select_for_update()
+                .defer("vocabulary_ids")
+                .annotate(
+                    next_ids=Substr(
+                        "vocabulary_ids",
+                        F("cursor") * cls.ID_SIZE + 1,
+                        count * cls.ID_SIZE,
+                        output_field=models.BinaryField(),
+                    )
+                )
+                .filter(user=user, topic=topic)
+                .first()
+            )
+            ids = []
+            if deck is None:
+                deck, _ = cls.objects.select_for_update().get_or_create(
+                    user=user, topic=topic
+                )
+            elif deck.topic_version == index.version:
+                next_ids = array("q")
+                next_ids.frombytes(deck.next_ids)
+                ids = next_ids.tolist()
+                deck.cursor += len(ids)
+                if len(ids) == count:
+                    deck.save(update_fields=["cursor", "updated_at"])
+                    return ids
+
+            # New, out of date or exhausted: start a new pass
+            drawn = set(ids)
+            deck.shuffle(index)
+            while len(ids) < count and deck.cursor < deck.size:
+                ids.extend(
+                    vocabulary_id
+                    for vocabulary_id in deck.take(count - len(ids))
+                    if vocabulary_id not in drawn
+                )
+            deck.save()
+        return ids
+
+
+class VocabularyDistractors(models.Model):
+    """The most similar other words of a topic, as ready-made wrong options.
+
+    Built offline by `manage.py build_distractor_index`.
+    """
+
+    vocabulary = models.OneToOneField(
+        Vocabulary,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="similar_words",
+    )
+    topic = models.ForeignKey(Topic, on_delete=models.CASCADE)
+    words = models.JSONField(default=list)  # most similar first
+
+    def __str__(self):
+        return f"{self.vocabulary_id}: {', '.join(self.words)}"
+
+
+class DistractorIndexBuild(models.Model):
+    """When a topic's distractors were built, and from which words"""
+
+    topic = models.OneToOneField(Topic, on_delete=models.CASCADE, primary_key=True)
+    fingerprint = models.CharField(max_length=40)
+    # Topic.vocabulary_version the words were read at; None if unknown
+    vocabulary_version = models.PositiveIntegerField(null=True, blank=True)
+    built_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.topic_id} ({self.fingerprint[:8]})"
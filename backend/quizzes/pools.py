@@ -0,0 +1,123 @@
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+from topics.models import Topic
+from .generation import build_questions
+
+
+class QuizPool:
+    """Ready-made quizzes per (topic, question count), refilled in the background.
+
+    Each pool is tagged with the topic's vocabulary version it was generated
+    from, so saving or deleting vocabulary in the topic invalidates it.
+    Pools and their hit/miss counters live in this process's memory; every
+    server worker has its own.
+    """
+
+    def __init__(self, size, question_counts):
+        self.size = size
+        self.question_counts = frozenset(question_counts)
+        self.hits = 0
+        self.misses = 0
+        self.started_at = timezone.now()
+        self._pools = {}  # (topic_id, question_count) -> (version, deque)
+        self._refilling = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="quiz-pool"
+        )
+
+    def is_pooled(self, question_count):
+        return self.size > 0 and question_count in self.question_counts
+
+    def pop(self, topic, question_count):
+        """Return a pooled quiz, or None on a miss, and schedule a refill"""
+        if not self.is_pooled(question_count):
+            return None
+
+        key = (topic.id, question_count)
+        questions = None
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is not None and pool[0] != topic.vocabulary_version:
+                del self._pools[key]
+                pool = None
+            if pool and pool[1]:
+                questions = pool[1].popleft()
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        self.schedule_refill(topic.id, question_count)
+        return questions
+
+    def schedule_refill(self, topic_id, question_count):
+        key = (topic_id, question_count)
+        with self._lock:
+            if key in self._refilling:
+                return
+            self._refilling.add(key)
+        self._executor.submit(self._refill, key)
+
+    def invalidate(self, topic_id):
+        with self._lock:
+            for key in [key for key in self._pools if key[0] == topic_id]:
+                del self._pools[key]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                # Counters cover this worker process only, since started_at
+                "scope": "process",
+                "pid": os.getpid(),
+                "started_at": self.started_at,
+                "pool_size": self.size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups * 100, 1) if lookups else 0,
+                "pools": [
+                    {
+                        "topic_id": topic_id,
+                        "question_count": question_count,
+                        "ready": len(quizzes),
+                    }
+                    for (topic_id, question_count), (_, quizzes) in sorted(
+                        self._pools.items()
+                    )
+                ],
+            }
+
+    def _refill(self, key):
+        topic_id, question_count = key
+        try:
+            topic = Topic.objects.get(id=topic_id)
+            with self._lock:
+                pool = self._pools.get(key)
+                if pool is None or pool[0] != topic.vocabulary_version:
+                    pool = (topic.vocabulary_version, deque())
+                    self._pools[key] = pool
+                missing = self.size - len(pool[1])
+
+            for _ in range(missing):
+                questions = build_questions(topic, question_count)
+                if not questions:
+                    break
+                pool[1].append(questions)
+        except Topic.DoesNotExist:
+            self.invalidate(topic_id)
+        finally:
+            with self._lock:
+                self._refilling.discard(key)
+            # Worker threads get their own connections; don't leak them
+            connections.close_all()
+
+
+quiz_pool = QuizPool(
+    size=getattr(settings, "QUIZ_POOL_SIZE", 0),
+    question_counts=getattr(settings, "QUIZ_POOL_QUESTION_COUNTS", ()),
+)
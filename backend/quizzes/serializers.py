@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import QuizSession
+from config.sparse_fields import SparseFieldsetSerializerMixin
+from .models import QuizSession, LeaderboardEntry
 from vocabulary.serializers import VocabularySerializer
 
 
@@ -26,7 +27,7 @@ class QuizQuestionSerializer(serializers.Serializer):
     isCorrect = serializers.BooleanField(required=False)
 
 
-class QuizSessionSerializer(serializers.ModelSerializer):
+class QuizSessionSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     topic_name = serializers.CharField(source="topic.name", read_only=True)
     topic_color = serializers.CharField(source="topic.color", read_only=True)
     questions = QuizQuestionSerializer(
@@ -35,6 +36,11 @@ class QuizSessionSerializer(serializers.ModelSerializer):
     correct_answers = serializers.ReadOnlyField()
     incorrect_answers = serializers.ReadOnlyField()
 
+    sparse_field_columns = {
+        "correct_answers": ["correct_count"],
+        "incorrect_answers": ["total_questions", "correct_count"],
+    }
+
     class Meta:
         model = QuizSession
         fields = [
@@ -54,6 +60,39 @@ class QuizSessionSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "completed_at"]
 
 
+class QuizSessionSummarySerializer(
+    SparseFieldsetSerializerMixin, serializers.ModelSerializer
+):
+    """Quiz session without the per-question payload, for history listings"""
+
+    topic_name = serializers.CharField(source="topic.name", read_only=True)
+    topic_color = serializers.CharField(source="topic.color", read_only=True)
+    correct_answers = serializers.ReadOnlyField()
+    incorrect_answers = serializers.ReadOnlyField()
+
+    sparse_field_columns = {
+        "correct_answers": ["correct_count"],
+        "incorrect_answers": ["total_questions", "correct_count"],
+    }
+
+    class Meta:
+        model = QuizSession
+        fields = [
+            "id",
+            "topic",
+            "topic_name",
+            "topic_color",
+            "score",
+            "total_questions",
+            "correct_answers",
+            "incorrect_answers",
+            "time_spent",
+            "accuracy",
+            "completed_at",
+        ]
+        read_only_fields = fields
+
+
 class QuizSubmissionSerializer(serializers.Serializer):
     topic_id = serializers.IntegerField()
     questions = QuizQuestionSerializer(many=True)
@@ -63,3 +102,39 @@ class QuizSubmissionSerializer(serializers.Serializer):
         if not value:
             raise serializers.ValidationError("Questions cannot be empty.")
         return value
+
+
+class QuizAnswersSubmissionSerializer(serializers.Serializer):
+    """Answers-only submission for a quiz held server-side"""
+
+    quiz_id = serializers.UUIDField()
+    answers = serializers.ListField(
+        child=serializers.IntegerField(min_value=0, allow_null=True),
+        allow_empty=False,
+    )
+    time_spent = serializers.IntegerField()
+
+
+class QuizMistakeSerializer(serializers.Serializer):
+    vocabulary = serializers.IntegerField()
+    word = serializers.CharField(source="vocabulary__word")
+    pronunciation = serializers.CharField(source="vocabulary__pronunciation")
+    meaning = serializers.CharField(source="vocabulary__meaning")
+    topic = serializers.IntegerField(source="vocabulary__topic")
+    mistakes = serializers.IntegerField()
+
+
+class LeaderboardEntrySerializer(serializers.ModelSerializer):
+    user_name = serializers.CharField(source="user.name", read_only=True)
+
+    class Meta:
+        model = LeaderboardEntry
+        fields = [
+            "user",
+            "user_name",
+            "topic",
+            "quiz_count",
+            "average_score",
+            "best_score",
+        ]
+        read_only_fields = fields
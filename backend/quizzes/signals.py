@@ -0,0 +1,11 @@
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from .models import LeaderboardEntry, LeaderboardBucket
+
+
+@receiver(post_delete, sender=LeaderboardEntry)
+def leaderboard_entry_deleted(sender, instance, **kwargs):
+    """Take entries removed by cascade, e.g. with their user, out of the buckets"""
+    deltas = {key: -1 for key in instance.buckets()}
+    transaction.on_commit(lambda: LeaderboardBucket.apply_deltas(deltas), robust=True)
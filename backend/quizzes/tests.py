@@ -1,3 +1,195 @@
+import base64
+import json
+from array import array
+from datetime import timedelta
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from accounts.models import User
+from topics.models import Topic
+from .models import PendingQuiz, QuizDeck, QuizSession
+from .word_index import TopicWordIndex
 
-# Create your tests here.
+
+def create_user(name="learner"):
+    return User.objects.create_user(
+        email=f"{name}@example.com", username=name, password="password"
+    )
+
+
+class PendingQuizGradeTests(TestCase):
+    def setUp(self):
+        self.quiz = PendingQuiz.objects.create(
+            user=create_user(),
+            topic=Topic.objects.create(name="Animals", description="Animals"),
+            questions=[
+                {
+                    "vocabulary_id": 1,
+                    "question": "cat",
+                    "options": ["meo", "cho", "ga", "vit"],
+                    "correct_answer": "meo",
+                },
+                {
+                    "vocabulary_id": 2,
+                    "question": "dog",
+                    "options": ["meo", "cho", "ga", "vit"],
+                    "correct_answer": "cho",
+                },
+            ],
+            expires_at=timezone.now() + timedelta(minutes=30),
+        )
+
+    def test_fills_in_chosen_option_and_correctness(self):
+        graded = self.quiz.grade([0, 2])
+
+        self.assertEqual(graded[0]["user_answer"], "meo")
+        self.assertTrue(graded[0]["is_correct"])
+        self.assertEqual(graded[1]["user_answer"], "ga")
+        self.assertFalse(graded[1]["is_correct"])
+        # The original question fields are kept
+        self.assertEqual(graded[1]["vocabulary_id"], 2)
+        self.assertEqual(graded[1]["correct_answer"], "cho")
+
+    def test_unanswered_and_out_of_range_answers_are_wrong(self):
+        graded = self.quiz.grade([None, 4])
+
+        self.assertEqual([q["user_answer"] for q in graded], ["", ""])
+        self.assertEqual([q["is_correct"] for q in graded], [False, False])
+
+    def test_does_not_change_stored_questions(self):
+        self.quiz.grade([0, 1])
+
+        self.assertNotIn("user_answer", self.quiz.questions[0])
+
+
+class QuizDeckTests(TestCase):
+    def setUp(self):
+        self.user = create_user()
+        self.topic = Topic.objects.create(name="Animals", description="Animals")
+        self.index = TopicWordIndex(
+            self.topic.id, 0, array("q", range(1, 6)), ["w"] * 5
+        )
+
+    def draw(self, count, index=None):
+        return QuizDeck.draw(self.user, self.topic, index or self.index, count)
+
+    def test_take_returns_ids_in_deck_order_and_advances(self):
+        deck = QuizDeck(user=self.user, topic=self.topic)
+        deck.shuffle(self.index)
+        order = array("q", deck.vocabulary_ids).tolist()
+
+        self.assertEqual(sorted(order), [1, 2, 3, 4, 5])
+        self.assertEqual(deck.take(2), order[:2])
+        self.assertEqual(deck.take(10), order[2:])
+        self.assertEqual(deck.take(1), [])
+        self.assertEqual(deck.cursor, 5)
+
+    def test_a_pass_deals_every_word_once(self):
+        drawn = self.draw(2) + self.draw(2) + self.draw(1)
+
+        self.assertEqual(sorted(drawn), [1, 2, 3, 4, 5])
+        deck = QuizDeck.objects.get(user=self.user, topic=self.topic)
+        self.assertEqual(deck.cursor, 5)
+
+    def test_exhausted_deck_is_reshuffled_without_repeats_in_one_quiz(self):
+        first = self.draw(4)
+        second = self.draw(3)
+
+        self.assertEqual(len(set(second)), 3)
+        # The leftover word comes first, then two fresh words
+        remaining = set(range(1, 6)) - set(first)
+        self.assertTrue(remaining < set(second))
+        deck = QuizDeck.objects.get(user=self.user, topic=self.topic)
+        self.assertEqual(deck.size, 5)
+        # One more if the new pass dealt the leftover word and it was skipped
+        self.assertIn(deck.cursor, (2, 3))
+
+    def test_new_vocabulary_version_starts_a_new_pass(self):
+        self.draw(3)
+        index = TopicWordIndex(self.topic.id, 1, array("q", range(1, 8)), ["w"] * 7)
+
+        drawn = self.draw(3, index)
+
+        self.assertEqual(len(set(drawn)), 3)
+        deck = QuizDeck.objects.get(user=self.user, topic=self.topic)
+        self.assertEqual((deck.topic_version, deck.size, deck.cursor), (1, 7, 3))
+
+    def test_count_is_capped_at_the_topic_size(self):
+        self.assertEqual(sorted(self.draw(10)), [1, 2, 3, 4, 5])
+        self.assertEqual(self.draw(0), [])
+
+
+class QuizHistoryPaginationTests(TestCase):
+    url = "/api/quizzes/history/"
+
+    def setUp(self):
+        self.user = create_user()
+        topic = Topic.objects.create(name="Animals", description="Animals")
+        for score in range(5):
+            QuizSession.objects.create(
+                user=self.user,
+                topic=topic,
+                questions_data=[],
+                score=score,
+                total_questions=10,
+                time_spent=30,
+                accuracy=score,
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def walk(self, url, link):
+        """Follow `link` ("next" or "previous") from url; returns the pages' ids"""
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append([session["id"] for session in response.data["results"]])
+            url = response.data[link]
+        return pages
+
+    def test_pages_follow_completed_at_newest_first(self):
+        sessions = QuizSession.objects.filter(user=self.user).order_by(
+            "-completed_at", "-pk"
+        )
+        expected = [session.id for session in sessions]
+
+        pages = self.walk(f"{self.url}?page_size=2", "next")
+
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        self.assertEqual(sum(pages, []), expected)
+
+    def test_rows_sharing_completed_at_are_neither_skipped_nor_repeated(self):
+        QuizSession.objects.update(completed_at=timezone.now())
+        expected = list(
+            QuizSession.objects.order_by("-pk").values_list("id", flat=True)
+        )
+
+        pages = self.walk(f"{self.url}?page_size=2", "next")
+        self.assertEqual(sum(pages, []), expected)
+
+        # Walking back from the last page visits the same pages in reverse
+        last_page = self.client.get(f"{self.url}?page_size=2")
+        while last_page.data["next"]:
+            last_page = self.client.get(last_page.data["next"])
+        back = self.walk(last_page.data["previous"], "previous")
+        self.assertEqual(back, pages[-2::-1])
+
+    def test_invalid_cursors_are_not_found(self):
+        def encode(cursor):
+            return base64.urlsafe_b64encode(json.dumps(cursor).encode()).decode()
+
+        cursors = [
+            "not base64!",
+            base64.urlsafe_b64encode(b"not json").decode(),
+            encode({"values": []}),
+            encode({"values": ["2024-01-01T00:00:00+00:00"], "reverse": False}),
+            encode({"values": [{"a": 1}, 1], "reverse": False}),
+            encode({"values": ["yesterday", 1], "reverse": False}),
+            encode({"values": ["2024-01-01T00:00:00+00:00", "x"], "reverse": False}),
+        ]
+        for cursor in cursors:
+            with self.subTest(cursor=cursor):
+                response = self.client.get(self.url, {"cursor": cursor})
+                self.assertEqual(response.status_code, 404)
+                self.assertEqual(response.data["detail"], "Invalid cursor")
@@ -4,7 +4,10 @@ from .views import (
     submit_quiz,
     QuizHistoryView,
     QuizSessionDetailView,
+    QuizMistakesView,
     quiz_stats,
+    quiz_pool_stats,
+    leaderboard,
 )
 
 urlpatterns = [
@@ -12,5 +15,8 @@ urlpatterns = [
     path("submit/", submit_quiz, name="submit-quiz"),
     path("history/", QuizHistoryView.as_view(), name="quiz-history"),
     path("stats/", quiz_stats, name="quiz-stats"),
+    path("mistakes/", QuizMistakesView.as_view(), name="quiz-mistakes"),
+    path("pools/", quiz_pool_stats, name="quiz-pool-stats"),
+    path("leaderboard/", leaderboard, name="quiz-leaderboard"),
     path("<int:pk>/", QuizSessionDetailView.as_view(), name="quiz-session-detail"),
 ]
@@ -1,13 +1,45 @@
 from rest_framework import generics, permissions, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from django.db import models
-from django.db.models import Avg, Count
-from random import sample, shuffle
-from .models import QuizSession
-from .serializers import QuizSessionSerializer, QuizSubmissionSerializer
+from django.conf import settings
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.db import models, transaction
+from django.db.models import Count
+from django.utils import timezone
+from config.idempotency import idempotent
+from config.pagination import KeysetPagination
+from config.sparse_fields import SparseFieldsetViewMixin
+from datetime import timedelta
+from .models import (
+    QuizSession,
+    QuizAnswer,
+    PendingQuiz,
+    ArchivedQuizSession,
+    UserQuizStats,
+    LeaderboardEntry,
+)
+from .generation import (
+    MAX_QUESTION_COUNT,
+    QUIZ_MODES,
+    build_questions,
+    build_adaptive_questions,
+    build_deck_questions,
+    build_mixed_questions,
+    build_stratified_questions,
+    default_difficulty_mix,
+    parse_difficulty_mix,
+)
+from .pools import quiz_pool
+from .serializers import (
+    QuizSessionSerializer,
+    QuizSessionSummarySerializer,
+    QuizSubmissionSerializer,
+    QuizAnswersSubmissionSerializer,
+    QuizMistakeSerializer,
+    LeaderboardEntrySerializer,
+)
 from topics.models import Topic
-from vocabulary.models import Vocabulary
 from progress.models import UserProgress
 
 
@@ -15,60 +47,100 @@ from progress.models import UserProgress
 @permission_classes([permissions.IsAuthenticated])
 def generate_quiz(request):
     topic_id = request.data.get("topic_id")
-    question_count = request.data.get("question_count", 10)
+    mode = request.data.get("mode", "random")
+    if mode not in QUIZ_MODES:
+        return Response(
+            {"error": f"Invalid quiz mode, expected one of: {', '.join(QUIZ_MODES)}"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
 
     try:
-        topic = Topic.objects.get(id=topic_id)
-    except Topic.DoesNotExist:
-        return Response({"error": "Topic not found"}, status=status.HTTP_404_NOT_FOUND)
+        question_count = int(request.data.get("question_count", 10))
+    except (TypeError, ValueError):
+        question_count = 0
+    if question_count < 1:
+        return Response(
+            {"error": "Invalid question count"}, status=status.HTTP_400_BAD_REQUEST
+        )
+    question_count = min(question_count, MAX_QUESTION_COUNT)
 
-    # Get all vocabulary for this topic
-    vocabulary_list = list(Vocabulary.objects.filter(topic=topic))
+    mix = None
+    if mode == "stratified":
+        try:
+            mix = (
+                parse_difficulty_mix(request.data["mix"])
+                if "mix" in request.data
+                else default_difficulty_mix(question_count)
+            )
+        except (TypeError, ValueError) as error:
+            return Response({"error": str(error)}, status=status.HTTP_400_BAD_REQUEST)
 
-    if len(vocabulary_list) < question_count:
-        question_count = len(vocabulary_list)
+    if mode == "mixed":
+        # Draws from the topics the user has studied, optionally narrowed
+        topic = None
+        topic_ids = request.data.get("topic_ids")
+        try:
+            if topic_ids is not None:
+                topic_ids = [int(topic_id) for topic_id in topic_ids]
+        except (TypeError, ValueError):
+            return Response(
+                {"error": "Invalid topic ids"}, status=status.HTTP_400_BAD_REQUEST
+            )
+    else:
+        try:
+            topic = Topic.objects.get(id=topic_id)
+        except Topic.DoesNotExist:
+            return Response(
+                {"error": "Topic not found"}, status=status.HTTP_404_NOT_FOUND
+            )
 
-    if question_count == 0:
+    # Only uniform random quizzes are pooled; the other modes depend on the
+    # user or the requested mix
+    if mode == "mixed":
+        questions = build_mixed_questions(request.user, question_count, topic_ids)
+    elif mode == "adaptive":
+        questions = build_adaptive_questions(topic, request.user, question_count)
+    elif mode == "deck":
+        questions = build_deck_questions(topic, request.user, question_count)
+    elif mode == "stratified":
+        questions = build_stratified_questions(topic, mix)
+    else:
+        questions = quiz_pool.pop(topic, question_count)
+        if questions is None:
+            questions = build_questions(topic, question_count)
+
+    if not questions:
         return Response(
-            {"error": "No vocabulary found for this topic"},
+            {
+                "error": (
+                    "No vocabulary found for this topic"
+                    if topic
+                    else "No studied topics with vocabulary found"
+                )
+            },
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    # Randomly select vocabulary for questions
-    selected_vocabulary = sample(vocabulary_list, question_count)
-
-    questions = []
-    for i, vocab in enumerate(selected_vocabulary):
-        # Get wrong answers from other vocabulary in the same topic
-        wrong_answers = [v.word for v in vocabulary_list if v.id != vocab.id]
-        wrong_options = sample(wrong_answers, min(3, len(wrong_answers)))
-
-        # Create options with correct answer
-        options = [vocab.word] + wrong_options
-        shuffle(options)
-
-        question = {
-            "id": f"q{i+1}",
-            "vocabulary": {
-                "id": vocab.id,
-                "word": vocab.word,
-                "pronunciation": vocab.pronunciation,
-                "meaning": vocab.meaning,
-                "example": vocab.example,
-                "difficulty": vocab.difficulty,
-            },
-            "options": options,
-            "correct_answer": vocab.word,
-        }
-        questions.append(question)
+    # Hold the quiz server-side so the client only has to submit answers
+    pending = PendingQuiz.objects.create(
+        user=request.user,
+        topic=topic,
+        questions=questions,
+        expires_at=timezone.now() + timedelta(seconds=settings.QUIZ_SESSION_TTL),
+    )
 
-    return Response({"questions": questions})
+    return Response({"quiz_id": pending.id, "questions": questions})
 
 
 @api_view(["POST"])
 @permission_classes([permissions.IsAuthenticated])
+@idempotent
 def submit_quiz(request):
     try:
+        # Answers-only submission for a quiz held server-side
+        if "quiz_id" in request.data:
+            return submit_quiz_answers(request)
+
         serializer = QuizSubmissionSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(
@@ -76,7 +148,6 @@ def submit_quiz(request):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        user = request.user
         topic_id = serializer.validated_data["topic_id"]
         questions = serializer.validated_data["questions"]
         time_spent = serializer.validated_data["time_spent"]
@@ -88,68 +159,151 @@ def submit_quiz(request):
                 {"error": "Topic not found"}, status=status.HTTP_404_NOT_FOUND
             )
 
-        # Calculate score and accuracy
-        correct_count = sum(1 for q in questions if q.get("is_correct", False))
-        total_questions = len(questions)
-        score = (
-            round((correct_count / total_questions) * 100) if total_questions > 0 else 0
+        return record_quiz(request.user, topic, questions, time_spent)
+
+    except Exception as e:
+        return Response(
+            {"error": "Internal server error"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
-        accuracy = (correct_count / total_questions) * 100 if total_questions > 0 else 0
 
-        # Create quiz session
-        quiz_session = QuizSession.objects.create(
-            user=user,
-            topic=topic,
-            questions_data=questions,
-            score=score,
-            total_questions=total_questions,
-            time_spent=time_spent,
-            accuracy=accuracy,
+
+def submit_quiz_answers(request):
+    serializer = QuizAnswersSubmissionSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(
+            {"error": "Invalid data", "details": serializer.errors},
+            status=status.HTTP_400_BAD_REQUEST,
         )
 
-        # Update user progress for each vocabulary
-        for i, question in enumerate(questions):
-            try:
-                vocabulary_data = question.get("vocabulary", {})
-                vocabulary_id = vocabulary_data.get("id")
-                # Handle both snake_case and camelCase
-                is_correct = question.get(
-                    "is_correct", question.get("isCorrect", False)
-                )
+    quiz_id = serializer.validated_data["quiz_id"]
+    answers = serializer.validated_data["answers"]
+    time_spent = serializer.validated_data["time_spent"]
 
-                if not vocabulary_id:
-                    continue
+    with transaction.atomic():
+        try:
+            pending = PendingQuiz.objects.select_related("topic").get(
+                id=quiz_id, user=request.user, expires_at__gt=timezone.now()
+            )
+        except PendingQuiz.DoesNotExist:
+            return Response(
+                {"error": "Quiz not found or expired"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
 
-                vocabulary = Vocabulary.objects.get(id=vocabulary_id)
-                progress, created = UserProgress.objects.get_or_create(
-                    user=user,
-                    vocabulary=vocabulary,
-                    defaults={"topic": vocabulary.topic},
-                )
-                progress.update_progress(is_correct)
+        if len(answers) != len(pending.questions):
+            return Response(
+                {"error": f"Expected {len(pending.questions)} answers"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-            except Vocabulary.DoesNotExist:
-                continue
-            except Exception as e:
-                continue
+        # A quiz can be submitted once; a concurrent duplicate deletes nothing
+        deleted, _ = PendingQuiz.objects.filter(pk=pending.pk).delete()
+        if not deleted:
+            return Response(
+                {"error": "Quiz already submitted"}, status=status.HTTP_409_CONFLICT
+            )
 
-        return Response({"session": QuizSessionSerializer(quiz_session).data})
+        return record_quiz(
+            request.user, pending.topic, pending.grade(answers), time_spent
+        )
 
-    except Exception as e:
+
+def record_quiz(user, topic, questions, time_spent):
+    """Store a graded quiz and update the user's progress.
+
+    A mixed quiz (no topic) updates progress and answer history but is not
+    stored as a QuizSession, which belongs to a single topic, so it doesn't
+    count towards quiz statistics or leaderboards.
+    """
+    # Calculate score and accuracy
+    correct_count = sum(1 for q in questions if q.get("is_correct", False))
+    total_questions = len(questions)
+    score = round((correct_count / total_questions) * 100) if total_questions > 0 else 0
+    accuracy = (correct_count / total_questions) * 100 if total_questions > 0 else 0
+
+    answers = []
+    for question in questions:
+        vocabulary_id = (question.get("vocabulary") or {}).get("id")
+        if vocabulary_id:
+            # Handle both snake_case and camelCase
+            is_correct = question.get("is_correct", question.get("isCorrect", False))
+            user_answer = question.get("user_answer", question.get("userAnswer"))
+            options = question.get("options", [])
+            chosen_option = (
+                options.index(user_answer) if user_answer in options else None
+            )
+            answers.append((vocabulary_id, bool(is_correct), chosen_option))
+
+    with transaction.atomic():
+        # Update user progress for all vocabulary in one upsert
+        recorded = UserProgress.objects.record_answers(
+            user, [answer[:2] for answer in answers]
+        )
+        known_vocabulary = {vocabulary_id for vocabulary_id, _, _ in recorded}
+
+        # Create quiz session
+        quiz_session = None
+        if topic is not None:
+            quiz_session = QuizSession.objects.create(
+                user=user,
+                topic=topic,
+                questions_data=questions,
+                score=score,
+                total_questions=total_questions,
+                correct_count=correct_count,
+                time_spent=time_spent,
+                accuracy=accuracy,
+            )
+
+        QuizAnswer.objects.bulk_create(
+            [
+                QuizAnswer(
+                    session=quiz_session,
+                    user=user,
+                    vocabulary_id=vocabulary_id,
+                    is_correct=is_correct,
+                    chosen_option=chosen_option,
+                )
+                for vocabulary_id, is_correct, chosen_option in answers
+                if vocabulary_id in known_vocabulary
+            ]
+        )
+
+    if quiz_session is None:
         return Response(
-            {"error": "Internal server error"},
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            {
+                "result": {
+                    "questions": questions,
+                    "score": score,
+                    "total_questions": total_questions,
+                    "correct_answers": correct_count,
+                    "incorrect_answers": total_questions - correct_count,
+                    "time_spent": time_spent,
+                    "accuracy": accuracy,
+                }
+            }
         )
+    return Response({"session": QuizSessionSerializer(quiz_session).data})
 
 
-class QuizHistoryView(generics.ListAPIView):
-    serializer_class = QuizSessionSerializer
+class QuizHistoryPagination(KeysetPagination):
+    # History has always been paged, so no opt-in is needed
+    opt_in = False
+
+
+class QuizHistoryView(SparseFieldsetViewMixin, generics.ListAPIView):
+    # Questions are only served by QuizSessionDetailView
+    serializer_class = QuizSessionSummarySerializer
     permission_classes = [permissions.IsAuthenticated]
-    pagination_class = None  # Disable pagination for quiz history
+    pagination_class = QuizHistoryPagination
+    keyset_ordering = "-completed_at"
 
     def get_queryset(self):
-        return QuizSession.objects.filter(user=self.request.user).select_related(
-            "topic"
+        return (
+            QuizSession.objects.filter(user=self.request.user)
+            .select_related("topic")
+            .defer("questions_data")
         )
 
 
@@ -162,15 +316,64 @@ class QuizSessionDetailView(generics.RetrieveAPIView):
             "topic"
         )
 
+    def get_object(self):
+        try:
+            return super().get_object()
+        except Http404:
+            # Fall back to cold storage for archived sessions
+            archived = get_object_or_404(
+                ArchivedQuizSession.objects.select_related("topic"),
+                pk=self.kwargs["pk"],
+                user=self.request.user,
+            )
+            return archived.hydrate()
+
+
+class QuizMistakesView(generics.ListAPIView):
+    """Words the user answered incorrectly, most recent mistakes first"""
+
+    serializer_class = QuizMistakeSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def list(self, request, *args, **kwargs):
+        topic_id = request.query_params.get("topic_id")
+        if topic_id:
+            try:
+                int(topic_id)
+            except ValueError:
+                return Response(
+                    {"error": "Invalid topic id"}, status=status.HTTP_400_BAD_REQUEST
+                )
+        return super().list(request, *args, **kwargs)
+
+    def get_queryset(self):
+        queryset = QuizAnswer.objects.filter(user=self.request.user, is_correct=False)
+
+        topic_id = self.request.query_params.get("topic_id")
+        if topic_id:
+            queryset = queryset.filter(vocabulary__topic_id=int(topic_id))
+
+        return (
+            queryset.values(
+                "vocabulary",
+                "vocabulary__word",
+                "vocabulary__pronunciation",
+                "vocabulary__meaning",
+                "vocabulary__topic",
+            )
+            .annotate(mistakes=Count("id"), latest=models.Max("id"))
+            .order_by("-latest")
+        )
+
 
 @api_view(["GET"])
 @permission_classes([permissions.IsAuthenticated])
 def quiz_stats(request):
     user = request.user
 
-    quiz_sessions = QuizSession.objects.filter(user=user)
-
-    if not quiz_sessions.exists():
+    try:
+        stats = UserQuizStats.objects.get(user=user)
+    except UserQuizStats.DoesNotExist:
         return Response(
             {
                 "total_quizzes": 0,
@@ -181,22 +384,76 @@ def quiz_stats(request):
             }
         )
 
-    stats = quiz_sessions.aggregate(
-        total_quizzes=Count("id"),
-        average_score=Avg("score"),
-        best_score=models.Max("score"),
-        total_time_spent=models.Sum("time_spent"),
-        topics_studied=Count("topic", distinct=True),
+    return Response(
+        {
+            "total_quizzes": stats.total_quizzes,
+            "average_score": round(stats.average_score, 1),
+            "best_score": stats.best_score,
+            "total_time_spent": stats.total_time_spent,
+            "topics_studied": len(stats.topic_ids),
+        }
     )
 
+
+@api_view(["GET"])
+@permission_classes([permissions.IsAuthenticated])
+def leaderboard(request):
+    topic_id = request.query_params.get("topic_id") or None
+    if topic_id is not None:
+        try:
+            topic_id = int(topic_id)
+        except ValueError:
+            return Response(
+                {"error": "Invalid topic id"}, status=status.HTTP_400_BAD_REQUEST
+            )
+    metric = request.query_params.get("metric", "average_score")
+    if metric not in LeaderboardEntry.METRICS:
+        return Response(
+            {"error": f"metric must be one of {', '.join(LeaderboardEntry.METRICS)}"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    try:
+        limit = max(min(int(request.query_params.get("limit", 10)), 100), 1)
+    except ValueError:
+        return Response({"error": "Invalid limit"}, status=status.HTTP_400_BAD_REQUEST)
+
+    entries = LeaderboardEntry.top(topic_id, metric, limit)
+
+    me = (
+        LeaderboardEntry.objects.filter(user=request.user, topic_id=topic_id)
+        .select_related("user")
+        .first()
+    )
+    my_rank = None
+    if me is not None:
+        my_rank = {"rank": me.rank(metric), **LeaderboardEntrySerializer(me).data}
+
+    # Competition ranking, matching LeaderboardEntry.rank for ties
+    ranked = []
+    for position, entry in enumerate(entries):
+        if not ranked or getattr(entry, metric) != ranked[-1][1]:
+            rank = position + 1
+        ranked.append((rank, getattr(entry, metric), entry))
+
     return Response(
         {
-            "total_quizzes": stats["total_quizzes"],
-            "average_score": (
-                round(stats["average_score"], 1) if stats["average_score"] else 0
-            ),
-            "best_score": stats["best_score"] or 0,
-            "total_time_spent": stats["total_time_spent"] or 0,
-            "topics_studied": stats["topics_studied"],
+            "topic_id": topic_id,
+            "metric": metric,
+            "entries": [
+                {"rank": rank, **LeaderboardEntrySerializer(entry).data}
+                for rank, _, entry in ranked
+            ],
+            "me": my_rank,
         }
     )
+
+
+@api_view(["GET"])
+@permission_classes([permissions.IsAuthenticated])
+def quiz_pool_stats(request):
+    if not request.user.role == "admin":
+        return Response(
+            {"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN
+        )
+
+    return Response(quiz_pool.stats())
@@ -0,0 +1,121 @@
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
+from random import randrange, sample
+
+from vocabulary.models import Vocabulary
+from .distractors import schedule_topic_rebuild
+
+
+class TopicWordIndex:
+    """Compact positional index of a topic's vocabulary ids and words"""
+
+    __slots__ = ("topic_id", "version", "ids", "words", "_positions", "_word_set")
+
+    def __init__(self, topic_id, version, ids, words):
+        self.topic_id = topic_id
+        self.version = version
+        self.ids = ids
+        self.words = words
+        self._positions = None
+        self._word_set = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def position_of(self, vocabulary_id):
+        """Position of a vocabulary id in the index, or None if it isn't there"""
+        if self._positions is None:
+            # Built on first use; random quizzes never need it
+            self._positions = {
+                vocabulary_id: position
+                for position, vocabulary_id in enumerate(self.ids)
+            }
+        return self._positions.get(vocabulary_id)
+
+    def has_word(self, word):
+        """Whether a word is currently in the topic"""
+        if self._word_set is None:
+            self._word_set = set(self.words)
+        return word in self._word_set
+
+    def sample_positions(self, count):
+        """Return `count` distinct random positions in the index"""
+        return sample(range(len(self.ids)), count)
+
+    def sample_distractors(self, position, count=3):
+        """Return up to `count` distinct words other than the one at `position`"""
+        size = len(self.ids)
+        count = min(count, size - 1)
+        if count <= 0:
+            return []
+
+        # Small topics: rejection would spin, just sample from the others
+        if size <= 2 * count + 1:
+            others = [i for i in range(size) if i != position]
+            return [self.words[i] for i in sample(others, count)]
+
+        # Large topics: index rejection, O(1) expected per option
+        taken = {position}
+        distractors = []
+        while len(distractors) < count:
+            i = randrange(size)
+            if i not in taken:
+                taken.add(i)
+                distractors.append(self.words[i])
+        return distractors
+
+
+# topic id -> TopicWordIndex, rebuilt when Topic.vocabulary_version moves on
+_indexes = {}
+
+
+def get_topic_index(topic):
+    """Return the word index for a topic, rebuilding it if it is stale"""
+    index = _indexes.get(topic.id)
+    if index is None or index.version != topic.vocabulary_version:
+        ids = array("q")
+        words = []
+        rows = (
+            Vocabulary.objects.filter(topic_id=topic.id)
+            .order_by()
+            .values_list("id", "word")
+        )
+        for vocabulary_id, word in rows.iterator():
+            ids.append(vocabulary_id)
+            words.append(word)
+
+        index = TopicWordIndex(topic.id, topic.vocabulary_version, ids, words)
+        _indexes[topic.id] = index
+        # The words changed (or this process hasn't checked yet)
+        schedule_topic_rebuild(topic.id)
+    return index
+
+
+class MixedWordIndex:
+    """Random access over several topics' word indexes as one sequence.
+
+    A global position is mapped to (topic index, position) by bisecting the
+    prefix sums of the topic sizes, so nothing is copied or concatenated.
+    """
+
+    def __init__(self, indexes):
+        self.indexes = [index for index in indexes if len(index)]
+        self.ends = list(accumulate(len(index) for index in self.indexes))
+
+    def __len__(self):
+        return self.ends[-1] if self.ends else 0
+
+    def locate(self, position):
+        """Return (TopicWordIndex, position within it) for a global position"""
+        slot = bisect_right(self.ends, position)
+        start = self.ends[slot - 1] if slot else 0
+        return self.indexes[slot], position - start
+
+    def sample_positions(self, count):
+        return sample(range(len(self)), count)
+
+
+def get_mixed_index(topics):
+    """Return a mixed index over the word indexes of the given topics"""
+    return MixedWordIndex(get_topic_index(topic) for topic in topics)
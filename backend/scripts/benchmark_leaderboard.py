@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+import os
+import sys
+import argparse
+import random
+import django
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Setup Django
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+django.setup()
+
+from django.db import connection, transaction
+from benchmark_utils import timed
+from accounts.models import User
+from quizzes.models import LeaderboardEntry, LeaderboardBucket
+
+BATCH_SIZE = 10000
+
+
+def benchmark_leaderboard(user_count):
+    print(f"Seeding {user_count} users with global leaderboard entries...")
+
+    # Everything is rolled back at the end; nothing is left in the database
+    with transaction.atomic():
+        bucket_counts = {}
+        for offset in range(0, user_count, BATCH_SIZE):
+            users = User.objects.bulk_create(
+                [
+                    User(
+                        username=f"bench_{i}",
+                        email=f"bench_{i}@bench.wordify",
+                        password="!",
+                    )
+                    for i in range(offset, min(offset + BATCH_SIZE, user_count))
+                ]
+            )
+            entries = []
+            for user in users:
+                quiz_count = random.randint(1, 50)
+                score_sum = random.randint(0, 100 * quiz_count)
+                entries.append(
+                    LeaderboardEntry(
+                        user=user,
+                        quiz_count=quiz_count,
+                        score_sum=score_sum,
+                        best_score=random.randint(score_sum // quiz_count, 100),
+                        average_score=score_sum / quiz_count,
+                    )
+                )
+            LeaderboardEntry.objects.bulk_create(entries)
+            for entry in entries:
+                for key in entry.buckets():
+                    bucket_counts[key] = bucket_counts.get(key, 0) + 1
+        LeaderboardBucket.apply_deltas(bucket_counts)
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {LeaderboardEntry._meta.db_table}")
+
+        ordered = list(
+            LeaderboardEntry.objects.filter(topic__isnull=True)
+            .order_by("-average_score")
+            .values_list("id", flat=True)
+        )
+        probes = {
+            "top 1%": ordered[len(ordered) // 100],
+            "median": ordered[len(ordered) // 2],
+            "bottom 1%": ordered[-(len(ordered) // 100) - 1],
+        }
+
+        print("Results:")
+        for metric in LeaderboardEntry.METRICS:
+            timed(
+                f"top 10 by {metric}",
+                lambda: list(LeaderboardEntry.top(None, metric, 10)),
+            )
+            for label, entry_id in probes.items():
+                entry = LeaderboardEntry.objects.get(id=entry_id)
+                timed(f"rank ({label}) by {metric}", lambda: entry.rank(metric))
+
+        transaction.set_rollback(True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark leaderboard queries")
+    parser.add_argument("--users", type=int, default=1_000_000)
+    args = parser.parse_args()
+    benchmark_leaderboard(args.users)
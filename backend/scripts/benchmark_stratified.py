@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+import os
+import sys
+import argparse
+import random
+import django
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Setup Django
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+django.setup()
+
+from django.db import connection, transaction
+from benchmark_utils import timed
+from topics.models import Topic
+from vocabulary.models import Vocabulary
+from quizzes.generation import (
+    DIFFICULTY_LEVELS,
+    default_difficulty_mix,
+    sample_difficulty_bucket,
+)
+
+BATCH_SIZE = 10000
+TOPIC_SIZES = (100, 1_000, 10_000, 100_000)
+
+
+def seed_topic(size):
+    topic = Topic.objects.create(name=f"bench_{size}", description="Benchmark")
+    for offset in range(0, size, BATCH_SIZE):
+        Vocabulary.objects.bulk_create(
+            [
+                Vocabulary(
+                    topic=topic,
+                    word=f"word_{i}",
+                    pronunciation="",
+                    meaning="",
+                    example="",
+                    difficulty=random.choice(DIFFICULTY_LEVELS),
+                )
+                for i in range(offset, min(offset + BATCH_SIZE, size))
+            ]
+        )
+    return topic
+
+
+def stratified(topic, mix):
+    for level, count in mix.items():
+        sample_difficulty_bucket(topic.id, level, count)
+
+
+def order_by_random(topic, mix):
+    for level, count in mix.items():
+        list(
+            Vocabulary.objects.filter(topic=topic, difficulty=level)
+            .order_by("?")
+            .values_list("id", flat=True)[:count]
+        )
+
+
+def benchmark_stratified(question_count):
+    mix = default_difficulty_mix(question_count)
+    print(f"Difficulty mix: {mix}")
+
+    # Everything is rolled back at the end; nothing is left in the database
+    with transaction.atomic():
+        for size in TOPIC_SIZES:
+            print(f"Seeding a topic with {size} words...")
+            topic = seed_topic(size)
+            with connection.cursor() as cursor:
+                cursor.execute(f"ANALYZE {Vocabulary._meta.db_table}")
+
+            timed(f"id-range probes ({size})", lambda: stratified(topic, mix))
+            timed(f"ORDER BY random() ({size})", lambda: order_by_random(topic, mix))
+
+        transaction.set_rollback(True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark difficulty-stratified quiz sampling"
+    )
+    parser.add_argument("--questions", type=int, default=10)
+    args = parser.parse_args()
+    benchmark_stratified(args.questions)
@@ -0,0 +1,15 @@
+import time
+
+
+def timed(label, func, repeat=20):
+    """Run `func` `repeat` times and print the median and worst timings"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    print(
+        f"  {label:<32} median {timings[len(timings) // 2]:7.2f} ms"
+        f"   max {timings[-1]:7.2f} ms"
+    )
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.2 on 2026-10-17 09:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('topics', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='topic',
+            name='vocabulary_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -15,6 +15,8 @@ class Topic(models.Model):
         default="#3B82F6",
     )
     vocabulary_count = models.IntegerField(default=0)
+    # Bumped whenever the topic's vocabulary changes; used to invalidate caches
+    vocabulary_version = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -27,4 +29,6 @@ class Topic(models.Model):
     def update_vocabulary_count(self):
         """Update the vocabulary count for this topic"""
         self.vocabulary_count = self.vocabulary_set.count()
-        self.save(update_fields=["vocabulary_count"])
+        self.vocabulary_version = models.F("vocabulary_version") + 1
+        self.save(update_fields=["vocabulary_count", "vocabulary_version"])
+        self.refresh_from_db(fields=["vocabulary_version"])
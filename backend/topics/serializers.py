@@ -1,8 +1,9 @@
 from rest_framework import serializers
+from config.sparse_fields import SparseFieldsetSerializerMixin
 from .models import Topic
 
 
-class TopicSerializer(serializers.ModelSerializer):
+class TopicSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Topic
         fields = [
@@ -1,14 +1,17 @@
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
+from config.pagination import KeysetPagination
+from config.sparse_fields import SparseFieldsetViewMixin
 from .models import Topic
 from .serializers import TopicSerializer
 
 
-class TopicListCreateView(generics.ListCreateAPIView):
+class TopicListCreateView(SparseFieldsetViewMixin, generics.ListCreateAPIView):
     queryset = Topic.objects.all()
     serializer_class = TopicSerializer
     permission_classes = [permissions.IsAuthenticated]
-    pagination_class = None  # Disable pagination for topics
+    pagination_class = KeysetPagination  # only with ?pagination=cursor
+    keyset_ordering = "name"
 
     def get_permissions(self):
         if self.request.method == "POST":
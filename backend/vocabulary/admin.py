@@ -4,7 +4,14 @@ from .models import Vocabulary
 
 @admin.register(Vocabulary)
 class VocabularyAdmin(admin.ModelAdmin):
-    list_display = ("word", "topic", "difficulty", "created_at")
+    list_display = (
+        "word",
+        "topic",
+        "difficulty",
+        "difficulty_score",
+        "error_rate",
+        "created_at",
+    )
     list_filter = ("topic", "difficulty", "created_at")
     search_fields = ("word", "meaning", "topic__name")
     list_select_related = ("topic",)
@@ -12,10 +19,20 @@ class VocabularyAdmin(admin.ModelAdmin):
     fieldsets = (
         (None, {"fields": ("topic", "word", "pronunciation", "difficulty")}),
         ("Content", {"fields": ("meaning", "example", "image")}),
+        (
+            "Calibration",
+            {"fields": ("difficulty_score", "error_rate", "answer_count")},
+        ),
         (
             "Timestamps",
             {"fields": ("created_at", "updated_at"), "classes": ("collapse",)},
         ),
     )
 
-    readonly_fields = ("created_at", "updated_at")
+    readonly_fields = (
+        "difficulty_score",
+        "error_rate",
+        "answer_count",
+        "created_at",
+        "updated_at",
+    )
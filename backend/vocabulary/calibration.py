@@ -0,0 +1,259 @@
+from datetime import timedelta
+import numpy as np
+from django.db import connection, transaction
+from django.utils import timezone
+from quizzes.models import QuizAnswer
+from .models import Vocabulary, LearnerAbility, CalibrationCheckpoint
+
+CHECKPOINT_NAME = "rasch"
+
+# Prior for users and words seen for the first time: N(0, 1) in logits. It
+# also keeps all-correct and all-wrong response patterns finite.
+BASE_PRIOR_PRECISION = 1.0
+
+# Newton steps are clipped so the first iterations can't overshoot
+MAX_STEP = 1.0
+
+FETCH_SIZE = 100_000
+
+# Answer ids are handed out when rows are inserted, not when they commit, so
+# a slow transaction can commit ids below the checkpoint after a run. Only
+# answers older than this are read; anything newer waits for the next run.
+COMMIT_LAG = timedelta(minutes=5)
+
+
+def load_answer_counts(after_id, up_to_id):
+    """Per (user, word) attempt and correct totals for a range of answer ids.
+
+    Aggregated in SQL so only one row per pair crosses the wire; returns four
+    int64 arrays: user ids, vocabulary ids, attempts and correct answers.
+    """
+    sql = f"""
+        SELECT user_id, vocabulary_id, count(*),
+            count(*) FILTER (WHERE is_correct)
+        FROM {QuizAnswer._meta.db_table}
+        WHERE id > %s AND id <= %s
+        GROUP BY user_id, vocabulary_id
+    """
+    chunks = [np.empty((0, 4), dtype=np.int64)]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [after_id, up_to_id])
+        # Convert in chunks so only a slice of the result is ever Python tuples
+        while rows := cursor.fetchmany(FETCH_SIZE):
+            chunks.append(np.array(rows, dtype=np.int64))
+    counts = np.concatenate(chunks)
+    return counts[:, 0], counts[:, 1], counts[:, 2], counts[:, 3]
+
+
+def _moments(ability, difficulty, users, items, attempts, correct):
+    probability = 1.0 / (1.0 + np.exp(difficulty[items] - ability[users]))
+    residual = correct - attempts * probability
+    weight = attempts * probability * (1.0 - probability)
+    return residual, weight
+
+
+def fit_rasch(
+    users,
+    items,
+    attempts,
+    correct,
+    ability_prior,
+    ability_precision,
+    difficulty_prior,
+    difficulty_precision,
+    max_iterations=100,
+    tolerance=1e-4,
+):
+    """Fit Rasch abilities and difficulties with Gaussian priors.
+
+    `users` and `items` are dense indices of each (user, word) cell, with
+    binomial `attempts`/`correct` totals. Abilities and difficulties take
+    alternating, fully vectorised Newton steps until no estimate moves more
+    than `tolerance`. Returns (ability, ability_information, difficulty,
+    difficulty_information); the informations are the posterior precisions.
+    """
+    ability = ability_prior.copy()
+    difficulty = difficulty_prior.copy()
+    attempts = attempts.astype(np.float64)
+    correct = correct.astype(np.float64)
+
+    cells = (users, items, attempts, correct)
+
+    for _ in range(max_iterations):
+        residual, weight = _moments(ability, difficulty, *cells)
+        gradient = np.bincount(users, residual, len(ability))
+        gradient -= ability_precision * (ability - ability_prior)
+        information = np.bincount(users, weight, len(ability)) + ability_precision
+        ability_step = np.clip(gradient / information, -MAX_STEP, MAX_STEP)
+        ability += ability_step
+
+        # A correct answer is evidence of an easier word, hence the sign
+        residual, weight = _moments(ability, difficulty, *cells)
+        gradient = -np.bincount(items, residual, len(difficulty))
+        gradient -= difficulty_precision * (difficulty - difficulty_prior)
+        information = np.bincount(items, weight, len(difficulty))
+        information += difficulty_precision
+        difficulty_step = np.clip(gradient / information, -MAX_STEP, MAX_STEP)
+        difficulty += difficulty_step
+
+        if max(np.abs(ability_step).max(), np.abs(difficulty_step).max()) < tolerance:
+            break
+
+    _, weight = _moments(ability, difficulty, *cells)
+    ability_information = np.bincount(users, weight, len(ability)) + ability_precision
+    difficulty_information = (
+        np.bincount(items, weight, len(difficulty)) + difficulty_precision
+    )
+    return ability, ability_information, difficulty, difficulty_information
+
+
+def calibrate(full=False, max_iterations=100, tolerance=1e-4):
+    """Fold quiz answers since the last run into the Rasch estimates.
+
+    Only answers after the checkpoint are loaded; the stored estimates of the
+    users and words they touch are the priors, weighted by their stored
+    information, so each run refines the previous one instead of refitting
+    the whole history. `full` discards the estimates and starts over.
+    Returns the number of answers read.
+    """
+    checkpoint, _ = CalibrationCheckpoint.objects.get_or_create(
+        name=CHECKPOINT_NAME
+    )
+    if full:
+        checkpoint.last_answer_id = 0
+        checkpoint.answers_seen = 0
+
+    up_to_id = (
+        QuizAnswer.objects.filter(created_at__lte=timezone.now() - COMMIT_LAG)
+        .order_by("-id")
+        .values_list("id", flat=True)
+        .first()
+        or 0
+    )
+    if up_to_id <= checkpoint.last_answer_id:
+        return 0
+
+    user_ids, vocabulary_ids, attempts, correct = load_answer_counts(
+        checkpoint.last_answer_id, up_to_id
+    )
+    user_keys, users = np.unique(user_ids, return_inverse=True)
+    item_keys, items = np.unique(vocabulary_ids, return_inverse=True)
+
+    ability_prior = np.zeros(len(user_keys))
+    ability_precision = np.full(len(user_keys), BASE_PRIOR_PRECISION)
+    difficulty_prior = np.zeros(len(item_keys))
+    difficulty_precision = np.full(len(item_keys), BASE_PRIOR_PRECISION)
+    previous_answers = np.zeros(len(item_keys), dtype=np.int64)
+    previous_errors = np.zeros(len(item_keys))
+
+    if not full:
+        abilities = LearnerAbility.objects.filter(user_id__in=user_keys.tolist())
+        for user_id, ability, information in abilities.values_list(
+            "user_id", "ability", "information"
+        ).iterator():
+            position = np.searchsorted(user_keys, user_id)
+            ability_prior[position] = ability
+            ability_precision[position] = max(information, BASE_PRIOR_PRECISION)
+
+        calibrated = Vocabulary.objects.filter(
+            id__in=item_keys.tolist(), difficulty_score__isnull=False
+        ).values_list(
+            "id",
+            "difficulty_score",
+            "difficulty_information",
+            "answer_count",
+            "error_rate",
+        )
+        for vocabulary_id, score, information, count, error_rate in (
+            calibrated.iterator()
+        ):
+            position = np.searchsorted(item_keys, vocabulary_id)
+            difficulty_prior[position] = score
+            difficulty_precision[position] = max(information, BASE_PRIOR_PRECISION)
+            previous_answers[position] = count
+            previous_errors[position] = (error_rate or 0.0) * count
+
+    ability, ability_information, difficulty, difficulty_information = fit_rasch(
+        users,
+        items,
+        attempts,
+        correct,
+        ability_prior,
+        ability_precision,
+        difficulty_prior,
+        difficulty_precision,
+        max_iterations=max_iterations,
+        tolerance=tolerance,
+    )
+
+    item_answers = np.bincount(items, attempts, len(item_keys)).astype(np.int64)
+    item_errors = np.bincount(items, attempts - correct, len(item_keys))
+    answer_count = previous_answers + item_answers
+    error_rate = (previous_errors + item_errors) / answer_count
+    user_answers = np.bincount(users, attempts, len(user_keys)).astype(np.int64)
+
+    vocabulary_sql = f"""
+        UPDATE {Vocabulary._meta.db_table} AS v SET
+            difficulty_score = c.score,
+            difficulty_information = c.information,
+            answer_count = c.answer_count,
+            error_rate = c.error_rate
+        FROM unnest(
+            %s::bigint[], %s::float8[], %s::float8[], %s::int[], %s::float8[]
+        ) AS c (id, score, information, answer_count, error_rate)
+        WHERE v.id = c.id
+    """
+    if full:
+        answer_count_sql = "EXCLUDED.answer_count"
+    else:
+        answer_count_sql = "a.answer_count + EXCLUDED.answer_count"
+    ability_sql = f"""
+        INSERT INTO {LearnerAbility._meta.db_table} AS a (
+            user_id, ability, information, answer_count, updated_at
+        )
+        SELECT c.*, %s
+        FROM unnest(%s::bigint[], %s::float8[], %s::float8[], %s::int[])
+            AS c (user_id, ability, information, answer_count)
+        ON CONFLICT (user_id) DO UPDATE SET
+            ability = EXCLUDED.ability,
+            information = EXCLUDED.information,
+            answer_count = {answer_count_sql},
+            updated_at = EXCLUDED.updated_at
+    """
+    now = timezone.now()
+    with transaction.atomic(), connection.cursor() as cursor:
+        if full:
+            Vocabulary.objects.exclude(id__in=item_keys.tolist()).update(
+                difficulty_score=None,
+                difficulty_information=0.0,
+                answer_count=0,
+                error_rate=None,
+            )
+            LearnerAbility.objects.exclude(user_id__in=user_keys.tolist()).delete()
+        cursor.execute(
+            vocabulary_sql,
+            [
+                item_keys.tolist(),
+                difficulty.tolist(),
+                difficulty_information.tolist(),
+                answer_count.tolist(),
+                error_rate.tolist(),
+            ],
+        )
+        cursor.execute(
+            ability_sql,
+            [
+                now,
+                user_keys.tolist(),
+                ability.tolist(),
+                ability_information.tolist(),
+                user_answers.tolist(),
+            ],
+        )
+        answers = int(item_answers.sum())
+        checkpoint.last_answer_id = up_to_id
+        checkpoint.answers_seen += answers
+        checkpoint.calibrated_at = now
+        checkpoint.save()
+
+    return answers
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from vocabulary.calibration import calibrate
+
+
+class Command(BaseCommand):
+    help = (
+        "Calibrate numeric word difficulty and error rates from quiz answers "
+        "with a Rasch model. Incremental: each run reads only new answers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Discard previous estimates and recalibrate from all answers",
+        )
+        parser.add_argument("--max-iterations", type=int, default=100)
+        parser.add_argument("--tolerance", type=float, default=1e-4)
+
+    def handle(self, *args, **options):
+        answers = calibrate(
+            full=options["full"],
+            max_iterations=options["max_iterations"],
+            tolerance=options["tolerance"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Calibrated difficulty from {answers} new answers")
+        )
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.2 on 2026-10-17 16:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocabulary', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vocabulary',
+            name='difficulty_score',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='vocabulary',
+            name='difficulty_information',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='vocabulary',
+            name='error_rate',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='vocabulary',
+            name='answer_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='CalibrationCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_answer_id', models.BigIntegerField(default=0)),
+                ('answers_seen', models.BigIntegerField(default=0)),
+                ('calibrated_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='LearnerAbility',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='ability', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('ability', models.FloatField(default=0.0)),
+                ('information', models.FloatField(default=0.0)),
+                ('answer_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
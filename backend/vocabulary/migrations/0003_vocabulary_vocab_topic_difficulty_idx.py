@@ -0,0 +1,18 @@
+# Generated by Django 5.2.2 on 2026-10-17 17:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('topics', '0002_topic_vocabulary_version'),
+        ('vocabulary', '0002_calibration'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vocabulary',
+            index=models.Index(fields=['topic', 'difficulty', 'id'], name='vocab_topic_difficulty_idx'),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.conf import settings
 from topics.models import Topic
 
 
@@ -21,9 +22,22 @@ class Vocabulary(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Calibrated from quiz answers by `manage.py calibrate_difficulty`
+    difficulty_score = models.FloatField(null=True, blank=True)  # Rasch logits
+    difficulty_information = models.FloatField(default=0.0)
+    error_rate = models.FloatField(null=True, blank=True)
+    answer_count = models.IntegerField(default=0)
+
     class Meta:
         ordering = ["word"]
         unique_together = ["topic", "word"]
+        indexes = [
+            # Random id-range probes per difficulty bucket (stratified quizzes)
+            models.Index(
+                fields=["topic", "difficulty", "id"],
+                name="vocab_topic_difficulty_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.word} ({self.topic.name})"
@@ -38,3 +52,33 @@ class Vocabulary(models.Model):
         super().delete(*args, **kwargs)
         # Update topic vocabulary count
         topic.update_vocabulary_count()
+
+
+class LearnerAbility(models.Model):
+    """A user's Rasch ability estimate, kept between calibration runs"""
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="ability",
+    )
+    ability = models.FloatField(default=0.0)  # logits
+    information = models.FloatField(default=0.0)
+    answer_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.ability:.2f}"
+
+
+class CalibrationCheckpoint(models.Model):
+    """How far the incremental difficulty calibration has read quiz answers"""
+
+    name = models.CharField(max_length=50, unique=True)
+    last_answer_id = models.BigIntegerField(default=0)
+    answers_seen = models.BigIntegerField(default=0)
+    calibrated_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.name} (answers up to {self.last_answer_id})"
@@ -1,8 +1,9 @@
 from rest_framework import serializers
+from config.sparse_fields import SparseFieldsetSerializerMixin
 from .models import Vocabulary
 
 
-class VocabularySerializer(serializers.ModelSerializer):
+class VocabularySerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     topic_name = serializers.CharField(source="topic.name", read_only=True)
     topic_color = serializers.CharField(source="topic.color", read_only=True)
 
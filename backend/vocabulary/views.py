@@ -1,11 +1,13 @@
 from rest_framework import generics, permissions
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from config.pagination import KeysetPagination
+from config.sparse_fields import SparseFieldsetViewMixin
 from .models import Vocabulary
 from .serializers import VocabularySerializer
 
 
-class VocabularyListCreateView(generics.ListCreateAPIView):
+class VocabularyListCreateView(SparseFieldsetViewMixin, generics.ListCreateAPIView):
     serializer_class = VocabularySerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
@@ -20,7 +22,9 @@ class VocabularyListCreateView(generics.ListCreateAPIView):
         serializer.save()
 
 
-class VocabularyDetailView(generics.RetrieveUpdateDestroyAPIView):
+class VocabularyDetailView(
+    SparseFieldsetViewMixin, generics.RetrieveUpdateDestroyAPIView
+):
     queryset = Vocabulary.objects.select_related("topic").all()
     serializer_class = VocabularySerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -36,10 +40,11 @@ class VocabularyDetailView(generics.RetrieveUpdateDestroyAPIView):
         instance.delete()
 
 
-class VocabularyByTopicView(generics.ListAPIView):
+class VocabularyByTopicView(SparseFieldsetViewMixin, generics.ListAPIView):
     serializer_class = VocabularySerializer
     permission_classes = [permissions.IsAuthenticated]
-    pagination_class = None  # Disable pagination for this view
+    pagination_class = KeysetPagination  # only with ?pagination=cursor
+    keyset_ordering = "word"
 
     def get_queryset(self):
         topic_id = self.kwargs["topic_id"]
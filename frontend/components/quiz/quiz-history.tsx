@@ -20,6 +20,9 @@ export function QuizHistory({ onBack, onViewResult }: QuizHistoryProps) {
   const [sessions, setSessions] = useState<QuizSession[]>([])
   const [filteredSessions, setFilteredSessions] = useState<QuizSession[]>([])
   const [loading, setLoading] = useState(true)
+  const [loadingMore, setLoadingMore] = useState(false)
+  const [nextPage, setNextPage] = useState<string | null>(null)
+  const [quizStats, setQuizStats] = useState<any>(null)
   const [searchTerm, setSearchTerm] = useState("")
   const [sortBy, setSortBy] = useState("date")
   const [filterBy, setFilterBy] = useState("all")
@@ -37,8 +40,14 @@ export function QuizHistory({ onBack, onViewResult }: QuizHistoryProps) {
     if (!user) return
 
     try {
-      const history = await quizAPI.getQuizHistory(user.id)
-      setSessions(history)
+      // Only the first page; totals come from the stats endpoint
+      const [history, stats] = await Promise.all([
+        quizAPI.getQuizHistory(user.id),
+        quizAPI.getQuizStats(),
+      ])
+      setSessions(history.sessions)
+      setNextPage(history.next)
+      setQuizStats(stats)
     } catch (error) {
       console.error("Failed to load quiz history:", error)
     } finally {
@@ -46,6 +55,21 @@ export function QuizHistory({ onBack, onViewResult }: QuizHistoryProps) {
     }
   }
 
+  const loadMoreSessions = async () => {
+    if (!user || !nextPage) return
+
+    setLoadingMore(true)
+    try {
+      const history = await quizAPI.getQuizHistory(user.id, nextPage)
+      setSessions((loaded) => [...loaded, ...history.sessions])
+      setNextPage(history.next)
+    } catch (error) {
+      console.error("Failed to load more quiz history:", error)
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+
   const filterAndSortSessions = () => {
     let filtered = [...sessions]
 
@@ -113,20 +137,15 @@ export function QuizHistory({ onBack, onViewResult }: QuizHistoryProps) {
   }
 
   const getOverallStats = () => {
-    if (sessions.length === 0) return null
-
-    const totalQuizzes = sessions.length
-    const averageScore = Math.round(sessions.reduce((sum, s) => sum + s.score, 0) / totalQuizzes)
-    const averageAccuracy = Math.round(sessions.reduce((sum, s) => sum + s.accuracy, 0) / totalQuizzes)
-    const totalTimeSpent = sessions.reduce((sum, s) => sum + s.timeSpent, 0)
-    const bestScore = Math.max(...sessions.map((s) => s.score))
+    if (!quizStats || quizStats.total_quizzes === 0) return null
 
+    // Server-side totals over the whole history, not just the loaded pages
     return {
-      totalQuizzes,
-      averageScore,
-      averageAccuracy,
-      totalTimeSpent,
-      bestScore,
+      totalQuizzes: quizStats.total_quizzes,
+      averageScore: Math.round(quizStats.average_score),
+      topicsStudied: quizStats.topics_studied,
+      totalTimeSpent: quizStats.total_time_spent,
+      bestScore: quizStats.best_score,
     }
   }
 
@@ -211,8 +230,8 @@ export function QuizHistory({ onBack, onViewResult }: QuizHistoryProps) {
                     <BarChart3 className="h-6 w-6" />
                   </div>
                   <div>
-                    <div className="text-2xl font-bold">{stats.averageAccuracy}%</div>
-                    <div className="text-orange-100 text-sm">Avg Accuracy</div>
+                    <div className="text-2xl font-bold">{stats.topicsStudied}</div>
+                    <div className="text-orange-100 text-sm">Topics Studied</div>
                   </div>
                 </div>
               </CardContent>
@@ -359,6 +378,14 @@ export function QuizHistory({ onBack, onViewResult }: QuizHistoryProps) {
             })}
           </div>
         )}
+
+        {nextPage && (
+          <div className="flex justify-center">
+            <Button variant="outline" onClick={loadMoreSessions} disabled={loadingMore}>
+              {loadingMore ? "Loading..." : "Load more"}
+            </Button>
+          </div>
+        )}
       </div>
     </div>
   )
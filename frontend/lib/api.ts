@@ -352,24 +352,29 @@ export const quizAPI = {
     return data.session
   },
 
-  getQuizHistory: async (userId: string) => {
-    const response = await fetch(`${API_BASE_URL}/quizzes/history/`, {
+  // History is cursor-paginated: returns one page of sessions and the URL of
+  // the next page (null on the last one), to be passed back as `pageUrl`
+  getQuizHistory: async (userId: string, pageUrl?: string | null) => {
+    const response = await fetch(pageUrl || `${API_BASE_URL}/quizzes/history/`, {
       headers: getAuthHeaders(),
     })
     const data = await handleResponse(response)
-    const sessions = data.results || data || []
-    
+    const sessions = Array.isArray(data) ? data : data.results || []
+
     // Map backend snake_case to frontend camelCase
-    return sessions.map((session: any) => ({
-      ...session,
-      topicName: session.topic_name,
-      topicColor: session.topic_color,
-      timeSpent: session.time_spent,
-      totalQuestions: session.total_questions,
-      correctAnswers: session.correct_answers,
-      incorrectAnswers: session.incorrect_answers,
-      completedAt: session.completed_at
-    }))
+    return {
+      sessions: sessions.map((session: any) => ({
+        ...session,
+        topicName: session.topic_name,
+        topicColor: session.topic_color,
+        timeSpent: session.time_spent,
+        totalQuestions: session.total_questions,
+        correctAnswers: session.correct_answers,
+        incorrectAnswers: session.incorrect_answers,
+        completedAt: session.completed_at
+      })),
+      next: (Array.isArray(data) ? null : data.next) as string | null,
+    }
   },
 
   getQuizSession: async (sessionId: string) => {